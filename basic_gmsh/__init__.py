@@ -0,0 +1,3 @@
+from basic_gmsh.mesh import Mesh, make_mesh, rescale
+from basic_gmsh.msh import write_msh
+from basic_gmsh.read import read_msh
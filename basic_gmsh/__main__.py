@@ -0,0 +1,3 @@
+from basic_gmsh.cli import main
+
+main()
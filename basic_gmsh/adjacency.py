@@ -0,0 +1,113 @@
+import numpy as np
+
+from basic_gmsh.cells import CELL_FACES, DIMS
+from basic_gmsh.connectivity import MID, block_grid, grid_strides
+from basic_gmsh.mesh import cell_blocks, per_axis
+
+
+def half_cells(v, dim):
+    # Position of a template node in half cells from the lowest corner
+    return (1,)*dim if v is MID else tuple(2*x for x in v)
+
+
+def template_links(blocks, cell_type):
+    # Match each local face of the elements of one cell, by the positions
+    # of its nodes, with a face in the same cell, or with a face across
+    # the cell side it lies on and the boundary face on that side
+    volume = next(b for b in blocks if b.axis is None)
+    dim = len(volume.template[0][0])
+
+    keys = [[frozenset(half_cells(nodes[i], dim) for i in face)
+             for face in CELL_FACES[cell_type]] for nodes in volume.template]
+    where = {}
+    for e, row in enumerate(keys):
+        for f, key in enumerate(row):
+            where.setdefault(key, []).append((e, f))
+
+    for e, row in enumerate(keys):
+        for f, key in enumerate(row):
+            inner = [p for p in where[key] if p != (e, f)]
+            if inner:
+                yield e, f, None, 0, *inner[0], None, None
+                continue
+
+            a = next(a for a in range(dim)
+                     if len({p[a] for p in key}) == 1 and
+                     next(iter(key))[a] != 1)
+            side = next(iter(key))[a] // 2
+            s = 2*side - 1
+
+            shift = [2*s*(x == a) for x in range(dim)]
+            other = frozenset(tuple(np.subtract(p, shift).tolist())
+                              for p in key)
+            e2, f2 = where[other][0]
+
+            b = next(i for i, b in enumerate(blocks)
+                     if b.axis == a and b.side == side)
+            faces = [frozenset(half_cells(v[:a] + (side,) + v[a:], dim)
+                               for v in nodes)
+                     for nodes in blocks[b].template]
+
+            yield e, f, a, s, e2, f2, b, faces.index(key)
+
+
+def adjacency(shape, cell_type, nx, periodic=False, split=None):
+    # For every local face of every volume element: the element across it,
+    # its local face there and the boundary face element on it, numbered
+    # as in the mesh file, with 0 (-1 for local faces) where there is none.
+    # With periodic, neighbours wrap around the grid
+    dim = DIMS[shape]
+    blocks = cell_blocks(shape, cell_type, split)
+    if any(b.alternate for b in blocks):
+        raise ValueError('Adjacency needs every cell split alike')
+    npts = tuple(n + 1 for n in per_axis(nx, dim))
+    counts = np.array(npts) - 1
+    strides = grid_strides(counts)
+
+    # Number of the element before the first of each block
+    starts, nele = [], 0
+    for b in blocks:
+        starts.append(nele)
+        nele += int(np.prod(block_grid(npts, b)))*len(b.template)
+
+    volume = next(i for i, b in enumerate(blocks) if b.axis is None)
+    nper = len(blocks[volume].template)
+    nfaces = len(CELL_FACES[cell_type])
+
+    cells = np.arange(int(np.prod(counts)))
+    ijk = (cells[:, None] // strides) % counts
+
+    size = (len(cells), nper, nfaces)
+    nbr = np.zeros(size, dtype=np.int32)
+    nbr_face = np.full(size, -1, dtype=np.int8)
+    bnd = np.zeros(size, dtype=np.int32)
+
+    for e, f, a, s, e2, f2, b, j in template_links(blocks, cell_type):
+        if a is None:
+            nbr[:, e, f] = starts[volume] + cells*nper + e2 + 1
+            nbr_face[:, e, f] = f2
+            continue
+
+        i = ijk[:, a] + s
+        inside = (i >= 0) & (i < counts[a])
+        other = cells + (i % counts[a] - ijk[:, a])*strides[a]
+
+        take = slice(None) if periodic else inside
+        nbr[take, e, f] = starts[volume] + other[take]*nper + e2 + 1
+        nbr_face[take, e, f] = f2
+
+        # Cells on the edge of the grid also have a boundary face there,
+        # numbered over the free axes
+        free = [x for x in range(dim) if x != a]
+        edge = ~inside
+        face = ijk[edge][:, free] @ grid_strides(counts[free])
+        bnd[edge, e, f] = starts[b] + face*len(blocks[b].template) + j + 1
+
+    return {'neighbours': nbr.reshape(-1, nfaces),
+            'neighbour_faces': nbr_face.reshape(-1, nfaces),
+            'boundary_faces': bnd.reshape(-1, nfaces),
+            'first_element': np.int32(starts[volume] + 1)}
+
+
+def write_adjacency(path, adj):
+    np.savez(path, **adj)
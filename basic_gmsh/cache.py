@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+# Bump whenever the bytes written for a given set of parameters change
+FORMAT_VERSION = 2
+
+
+def cache_dir():
+    return os.environ.get('BASIC_GMSH_CACHE',
+                          os.path.expanduser('~/.cache/basic_gmsh'))
+
+
+def cache_key(**params):
+    params = dict(params, version=FORMAT_VERSION)
+    data = json.dumps(params, sort_keys=True).encode()
+    return hashlib.sha256(data).hexdigest()
+
+
+def link_or_copy(src, dst):
+    if os.path.exists(dst):
+        os.remove(dst)
+
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def entry(key, root=None):
+    path = os.path.join(root or cache_dir(), key + '.msh')
+    if not os.path.exists(path):
+        return None
+
+    # Entries are evicted least recently used first, so mark it as used
+    os.utime(path)
+
+    return path
+
+
+def fetch(key, dst, root=None):
+    path = entry(key, root)
+    if path:
+        link_or_copy(path, dst)
+
+    return path is not None
+
+
+def store(key, src, max_size, root=None, offset=0, end=None):
+    # Cache the file src, or only its bytes in [offset, end)
+    root = root or cache_dir()
+    os.makedirs(root, exist_ok=True)
+
+    # Stage next to the entry so concurrent readers never see a partial file
+    fd, tmp = tempfile.mkstemp(dir=root, suffix='.tmp')
+    os.close(fd)
+    try:
+        if offset or end is not None:
+            with open(src, 'rb') as fs, open(tmp, 'wb') as ft:
+                fs.seek(offset)
+                if end is None:
+                    shutil.copyfileobj(fs, ft)
+                else:
+                    ft.write(fs.read(end - offset))
+        else:
+            link_or_copy(src, tmp)
+
+        os.replace(tmp, os.path.join(root, key + '.msh'))
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    evict(max_size, root)
+
+
+def evict(max_size, root=None):
+    root = root or cache_dir()
+
+    entries = []
+    for e in os.scandir(root):
+        if e.name.endswith('.msh'):
+            st = e.stat()
+            entries.append((st.st_mtime, st.st_size, e.path))
+
+    total = sum(s for t, s, p in entries)
+    for t, s, p in sorted(entries):
+        if total <= max_size:
+            break
+
+        os.remove(p)
+        total -= s
@@ -0,0 +1,262 @@
+from collections import namedtuple
+
+from basic_gmsh.connectivity import MID
+
+# A group of elements sharing a type and tags, either one per cell
+# (axis None) or one per face on the given side of the grid. Alternating
+# blocks use their template mirrored along its first axis in every other
+# cell, the cells whose index adds up to an odd number
+Block = namedtuple('Block', 'etype phys elem axis side template alternate',
+                   defaults=[False])
+
+# Cell templates are lists of node offsets (di, dj, dk) from the lowest
+# corner of the cell, face templates are offsets along the two free axes
+QUAD_FACE = [[(0, 0), (1, 0), (1, 1), (0, 1)]]
+QUAD_FACE_T = [[(0, 0), (0, 1), (1, 1), (1, 0)]]
+
+HEX = [[(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0),
+        (0, 0, 1), (1, 0, 1), (1, 1, 1), (0, 1, 1)]]
+
+TET = [
+    # Bottom
+    [(0, 0, 0), (1, 0, 0), (0, 1, 0), MID],
+    [(1, 0, 0), (1, 1, 0), (0, 1, 0), MID],
+    # Top
+    [(0, 0, 1), (0, 1, 1), (1, 0, 1), MID],
+    [(1, 0, 1), (0, 1, 1), (1, 1, 1), MID],
+    # East
+    [(1, 0, 0), (1, 0, 1), (1, 1, 0), MID],
+    [(1, 0, 1), (1, 1, 1), (1, 1, 0), MID],
+    # West
+    [(0, 0, 0), (0, 1, 0), (0, 0, 1), MID],
+    [(0, 0, 1), (0, 1, 0), (0, 1, 1), MID],
+    # South
+    [(0, 0, 0), (0, 0, 1), (1, 0, 0), MID],
+    [(1, 0, 0), (0, 0, 1), (1, 0, 1), MID],
+    # North
+    [(0, 1, 0), (1, 1, 0), (0, 1, 1), MID],
+    [(1, 1, 0), (1, 1, 1), (0, 1, 1), MID],
+]
+
+# Kuhn tets around the main diagonal of the cell
+TET6 = [
+    [(0, 0, 0), (1, 0, 0), (1, 1, 0), (1, 1, 1)],
+    [(0, 0, 0), (1, 0, 1), (1, 0, 0), (1, 1, 1)],
+    [(0, 0, 0), (1, 1, 0), (0, 1, 0), (1, 1, 1)],
+    [(0, 0, 0), (0, 1, 0), (0, 1, 1), (1, 1, 1)],
+    [(0, 0, 0), (0, 0, 1), (1, 0, 1), (1, 1, 1)],
+    [(0, 0, 0), (0, 1, 1), (0, 0, 1), (1, 1, 1)],
+]
+
+# A corner tet at every other vertex and the tet between them
+TET5 = [
+    [(1, 0, 0), (1, 1, 0), (0, 0, 0), (1, 0, 1)],
+    [(0, 1, 0), (0, 0, 0), (1, 1, 0), (0, 1, 1)],
+    [(0, 0, 1), (1, 0, 1), (0, 0, 0), (0, 1, 1)],
+    [(1, 1, 1), (1, 1, 0), (1, 0, 1), (0, 1, 1)],
+    [(0, 0, 0), (1, 0, 1), (1, 1, 0), (0, 1, 1)],
+]
+
+# Face triangles split along the (0, 0)-(1, 1) diagonal, or the other one
+DIAG_FACE = [[(0, 0), (1, 0), (1, 1)], [(0, 0), (1, 1), (0, 1)]]
+DIAG_FACE_T = [[(0, 0), (1, 1), (1, 0)], [(0, 0), (0, 1), (1, 1)]]
+ANTI_FACE = [[(0, 0), (1, 0), (0, 1)], [(1, 0), (1, 1), (0, 1)]]
+ANTI_FACE_T = [[(0, 0), (0, 1), (1, 0)], [(1, 0), (0, 1), (1, 1)]]
+
+PRI = [[(0, 0, 0), (1, 0, 0), (0, 1, 0), (0, 0, 1), (1, 0, 1), (0, 1, 1)],
+       [(1, 1, 0), (0, 1, 0), (1, 0, 0), (1, 1, 1), (0, 1, 1), (1, 0, 1)]]
+
+PYR = [
+    # Bottom
+    [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0), MID],
+    # Top
+    [(0, 0, 1), (0, 1, 1), (1, 1, 1), (1, 0, 1), MID],
+    # East
+    [(1, 0, 0), (1, 0, 1), (1, 1, 1), (1, 1, 0), MID],
+    # West
+    [(0, 0, 0), (0, 1, 0), (0, 1, 1), (0, 0, 1), MID],
+    # South
+    [(0, 0, 0), (0, 0, 1), (1, 0, 1), (1, 0, 0), MID],
+    # North
+    [(0, 1, 0), (1, 1, 0), (1, 1, 1), (0, 1, 1), MID],
+]
+
+QUAD = [[(0, 0), (1, 0), (1, 1), (0, 1)]]
+
+TRI = [[(0, 0), (1, 0), (0, 1)],
+       [(1, 0), (1, 1), (0, 1)]]
+
+LINE_FACE = [[(0,), (1,)]]
+
+
+# Element blocks in file order: west, east, south, north, (bottom, top),
+# then the volume
+BLOCKS = {
+    ('cube', 'hex'): [
+        Block(3, 2, 2, 0, 0, QUAD_FACE),
+        Block(3, 5, 5, 0, 1, QUAD_FACE),
+        Block(3, 3, 3, 1, 0, QUAD_FACE),
+        Block(3, 6, 6, 1, 1, QUAD_FACE),
+        Block(3, 4, 4, 2, 0, QUAD_FACE_T),
+        Block(3, 7, 7, 2, 1, QUAD_FACE_T),
+        Block(5, 1, 1, None, None, HEX),
+    ],
+    ('cube', 'tet'): [
+        Block(2, 2, 2, 0, 0, [[(0, 0), (1, 0), (0, 1)],
+                              [(0, 1), (1, 0), (1, 1)]]),
+        Block(2, 5, 5, 0, 1, [[(0, 0), (0, 1), (1, 0)],
+                              [(0, 1), (1, 1), (1, 0)]]),
+        Block(2, 3, 3, 1, 0, [[(0, 0), (0, 1), (1, 0)],
+                              [(1, 0), (0, 1), (1, 1)]]),
+        Block(2, 6, 6, 1, 1, [[(0, 0), (1, 0), (0, 1)],
+                              [(1, 0), (1, 1), (0, 1)]]),
+        Block(2, 4, 4, 2, 0, [[(0, 0), (1, 0), (0, 1)],
+                              [(1, 0), (1, 1), (0, 1)]]),
+        Block(2, 7, 7, 2, 1, [[(0, 0), (0, 1), (1, 0)],
+                              [(1, 0), (0, 1), (1, 1)]]),
+        Block(4, 1, 1, None, None, TET),
+    ],
+    ('cube', 'pri'): [
+        Block(3, 2, 2, 0, 0, QUAD_FACE),
+        Block(3, 5, 5, 0, 1, QUAD_FACE),
+        Block(3, 3, 3, 1, 0, QUAD_FACE),
+        Block(3, 6, 6, 1, 1, QUAD_FACE),
+        Block(2, 4, 4, 2, 0, [[(0, 0), (0, 1), (1, 0)],
+                              [(1, 1), (1, 0), (0, 1)]]),
+        Block(2, 7, 7, 2, 1, [[(0, 0), (0, 1), (1, 0)],
+                              [(1, 1), (1, 0), (0, 1)]]),
+        Block(6, 1, 1, None, None, PRI),
+    ],
+    ('cube', 'pyr'): [
+        Block(3, 2, 2, 0, 0, QUAD_FACE_T),
+        Block(3, 5, 5, 0, 1, QUAD_FACE_T),
+        Block(3, 3, 3, 1, 0, QUAD_FACE),
+        Block(3, 6, 6, 1, 1, QUAD_FACE),
+        Block(3, 4, 4, 2, 0, QUAD_FACE),
+        Block(3, 7, 7, 2, 1, QUAD_FACE),
+        Block(7, 1, 1, None, None, PYR),
+    ],
+    ('square', 'quad'): [
+        Block(1, 2, 1, 0, 0, LINE_FACE),
+        Block(1, 4, 3, 0, 1, LINE_FACE),
+        Block(1, 3, 2, 1, 0, LINE_FACE),
+        Block(1, 5, 4, 1, 1, LINE_FACE),
+        Block(3, 1, 4, None, None, QUAD),
+    ],
+    ('square', 'tri'): [
+        Block(1, 2, 1, 0, 0, LINE_FACE),
+        Block(1, 4, 3, 0, 1, LINE_FACE),
+        Block(1, 3, 2, 1, 0, LINE_FACE),
+        Block(1, 5, 4, 1, 1, LINE_FACE),
+        Block(2, 1, 3, None, None, TRI),
+    ],
+}
+
+# Cube tet decompositions by number of tets per cell: 12 around the centroid
+# node, 6 Kuhn tets, the same in every cell, or 5 tets, mirrored in every
+# other cell so the face diagonals of neighbouring cells match
+TET_SPLITS = {
+    12: BLOCKS['cube', 'tet'],
+    6: [
+        Block(2, 2, 2, 0, 0, DIAG_FACE),
+        Block(2, 5, 5, 0, 1, DIAG_FACE_T),
+        Block(2, 3, 3, 1, 0, DIAG_FACE_T),
+        Block(2, 6, 6, 1, 1, DIAG_FACE),
+        Block(2, 4, 4, 2, 0, DIAG_FACE),
+        Block(2, 7, 7, 2, 1, DIAG_FACE_T),
+        Block(4, 1, 1, None, None, TET6),
+    ],
+    5: [
+        Block(2, 2, 2, 0, 0, DIAG_FACE, True),
+        Block(2, 5, 5, 0, 1, ANTI_FACE_T, True),
+        Block(2, 3, 3, 1, 0, DIAG_FACE_T, True),
+        Block(2, 6, 6, 1, 1, ANTI_FACE, True),
+        Block(2, 4, 4, 2, 0, DIAG_FACE, True),
+        Block(2, 7, 7, 2, 1, ANTI_FACE_T, True),
+        Block(4, 1, 1, None, None, TET5, True),
+    ],
+}
+
+# GMSH element type of each cell and face type, with the higher order
+# Lagrange types named by their number of nodes
+ETYPES = {'line': 1, 'tri': 2, 'quad': 3, 'tet': 4, 'hex': 5, 'pri': 6,
+          'pyr': 7,
+          'line3': 8, 'line4': 26, 'line5': 27, 'line6': 28,
+          'tri6': 9, 'tri10': 21, 'tri15': 23, 'tri21': 25,
+          'quad9': 10, 'quad16': 36, 'quad25': 37, 'quad36': 38,
+          'tet10': 11, 'tet20': 29, 'tet35': 30, 'tet56': 31,
+          'hex27': 12, 'hex64': 92, 'hex125': 93, 'hex216': 94,
+          'pri18': 13,
+          'pyr14': 14, 'pyr30': 118, 'pyr55': 119, 'pyr91': 120}
+
+# Face type by dimension of the cells and number of nodes
+FACES = {
+    2: {2: 'line', 3: 'line3', 4: 'line4', 5: 'line5', 6: 'line6'},
+    3: {3: 'tri', 6: 'tri6', 10: 'tri10', 15: 'tri15', 21: 'tri21',
+        4: 'quad', 9: 'quad9', 16: 'quad16', 25: 'quad25', 36: 'quad36'},
+}
+
+# Dimension of each domain shape
+DIMS = {'cube': 3, 'square': 2}
+
+# Physical names (dim, tag, name) in header order
+NAMES = {
+    'cube': [
+        (3, 1, 'fluid'),
+        (2, 2, 'periodic_0_l'),
+        (2, 3, 'periodic_1_l'),
+        (2, 4, 'periodic_2_l'),
+        (2, 5, 'periodic_0_r'),
+        (2, 6, 'periodic_1_r'),
+        (2, 7, 'periodic_2_r'),
+    ],
+    'square': [
+        (1, 2, 'periodic_0_l'),
+        (1, 3, 'periodic_1_l'),
+        (1, 4, 'periodic_0_r'),
+        (1, 5, 'periodic_1_r'),
+        (2, 1, 'fluid'),
+    ],
+}
+
+# Edges of each cell type as node positions, in gmsh order
+CELL_EDGES = {
+    'line': [(0, 1)],
+    'tri': [(0, 1), (1, 2), (2, 0)],
+    'quad': [(0, 1), (1, 2), (2, 3), (3, 0)],
+    'tet': [(0, 1), (1, 2), (2, 0), (3, 0), (3, 2), (3, 1)],
+    'hex': [(0, 1), (0, 3), (0, 4), (1, 2), (1, 5), (2, 3), (2, 6), (3, 7),
+            (4, 5), (4, 7), (5, 6), (6, 7)],
+    'pri': [(0, 1), (0, 2), (0, 3), (1, 2), (1, 4), (2, 5), (3, 4), (3, 5),
+            (4, 5)],
+    'pyr': [(0, 1), (0, 3), (0, 4), (1, 2), (1, 4), (2, 3), (2, 4), (3, 4)],
+}
+
+# Local faces of each cell type as node positions, in gmsh order
+CELL_FACES = {
+    'tri': [(0, 1), (1, 2), (2, 0)],
+    'quad': [(0, 1), (1, 2), (2, 3), (3, 0)],
+    'tet': [(0, 2, 1), (0, 1, 3), (0, 3, 2), (3, 1, 2)],
+    'hex': [(0, 3, 2, 1), (0, 1, 5, 4), (0, 4, 7, 3), (1, 2, 6, 5),
+            (2, 3, 7, 6), (4, 5, 6, 7)],
+    'pri': [(0, 2, 1), (3, 4, 5), (0, 1, 4, 3), (0, 3, 5, 2), (1, 2, 5, 4)],
+    'pyr': [(0, 1, 4), (3, 0, 4), (1, 2, 4), (2, 3, 4), (0, 3, 2, 1)],
+}
+
+# Dimension and number of vertices of each first order cell type
+CELL_DIMS = {'line': 1, 'tri': 2, 'quad': 2, 'tet': 3, 'hex': 3, 'pri': 3,
+             'pyr': 3}
+VERTICES = {'line': 2, 'tri': 3, 'quad': 4, 'tet': 4, 'hex': 8, 'pri': 6,
+            'pyr': 5}
+
+# Vertices of the gmsh reference elements
+REFERENCE = {
+    'tri': [(0, 0), (1, 0), (0, 1)],
+    'quad': [(-1, -1), (1, -1), (1, 1), (-1, 1)],
+    'tet': [(0, 0, 0), (1, 0, 0), (0, 1, 0), (0, 0, 1)],
+    'hex': [(-1, -1, -1), (1, -1, -1), (1, 1, -1), (-1, 1, -1),
+            (-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1)],
+    'pri': [(0, 0, -1), (1, 0, -1), (0, 1, -1), (0, 0, 1), (1, 0, 1),
+            (0, 1, 1)],
+    'pyr': [(-1, -1, 0), (1, -1, 0), (1, 1, 0), (-1, 1, 0), (0, 0, 1)],
+}
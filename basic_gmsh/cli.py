@@ -0,0 +1,323 @@
+import argparse
+import os
+import shutil
+import stat
+import sys
+
+import numpy as np
+
+from basic_gmsh import cache
+from basic_gmsh.adjacency import adjacency, write_adjacency
+from basic_gmsh.cells import BLOCKS, DIMS, ETYPES, NAMES
+from basic_gmsh.compress import COMPRESSORS, SUFFIXES, open_output
+from basic_gmsh.export import h5py, write_hdf5, write_npz
+from basic_gmsh.highorder import lagrange_type
+from basic_gmsh.mesh import (make_mesh, make_physical_tags, mesh_nodes,
+                             per_axis, per_axis_spacing)
+from basic_gmsh.msh import (mesh_groups, write_elements, write_header,
+                             write_msh, write_nodes, write_periodic)
+from basic_gmsh.msh4 import write_msh4
+from basic_gmsh.nodes import SPACINGS, axis_points
+from basic_gmsh.ordering import KEYS, reorder
+from basic_gmsh.outofcore import write_mmap
+from basic_gmsh.partition import partition_dims, write_parts
+from basic_gmsh.profile import format_records, profile, stage
+from basic_gmsh.validate import validate
+
+WRITERS = {'2.2': write_msh, '4.1': write_msh4, 'npz': write_npz,
+           'hdf5': write_hdf5}
+EXTENSIONS = {'2.2': '.msh', '4.1': '.msh', 'npz': '.npz', 'hdf5': '.h5'}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='basic-gmsh',
+                                     description='Make a structured gmsh')
+    parser.add_argument('shape', choices=sorted(NAMES))
+    parser.add_argument('-c', '--cell', required=True,
+                        choices=sorted({c for s, c in BLOCKS}))
+    parser.add_argument('-n', '--nx', required=True, dest='nx', type=int,
+                        nargs='+', help='cells, once or per axis')
+    parser.add_argument('-l', default=[1.0], dest='l', type=float, nargs='+',
+                        help='extent, once or per axis')
+    parser.add_argument('-0', '--x0', default=[0.0], dest='x0', type=float,
+                        nargs='+', help='origin, once or per axis')
+    parser.add_argument('-s', '--spacing', default=['uniform'], nargs='+',
+                        help='point spacing once or per axis: '
+                             f'{", ".join(SPACINGS)}, optionally with a '
+                             ':parameter, or a file of points')
+    parser.add_argument('--order', default=1, type=int,
+                        help='order of the Lagrange elements')
+    parser.add_argument('--split', type=int, choices=[12, 6, 5],
+                        help='tets per cube cell: 12 around the centroid '
+                             '(the default), 6 sharing a diagonal or 5 '
+                             'alternating between cells')
+    parser.add_argument('-o', '--output')
+    parser.add_argument('-f', '--format', default='2.2',
+                        choices=sorted(WRITERS),
+                        help='MSH format version, or npz or hdf5 arrays')
+    parser.add_argument('--binary', action='store_true')
+    parser.add_argument('--compress', choices=sorted(SUFFIXES),
+                        help='compress the output as it is written, in '
+                             'blocks compressed in parallel')
+    parser.add_argument('--mmap', action='store_true',
+                        help='write binary MSH 2.2 out-of-core, slab by slab')
+    parser.add_argument('--periodic', action='store_true',
+                        help='write the periodic node pairs')
+    parser.add_argument('--adjacency', action='store_true',
+                        help='also write element face neighbours to '
+                             '<output>_adjacency.npz')
+    parser.add_argument('--ordering', default='lexicographic',
+                        choices=['lexicographic'] + sorted(KEYS),
+                        help='node and element numbering')
+    parser.add_argument('--validate', action='store_true',
+                        help='check the element Jacobians, boundary faces '
+                             'and total volume before writing')
+    parser.add_argument('--profile', nargs='?', const='table',
+                        choices=['table', 'json'],
+                        help='report the time of each stage on stderr')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='also trace the peak memory of each stage, '
+                             'which slows down formatting')
+    parser.add_argument('-j', '--jobs', default=1, type=int,
+                        help='processes used to format the output')
+    parser.add_argument('-p', '--parts', type=int,
+                        help='write one file per part of a block partition')
+    parser.add_argument('--cache', action='store_true',
+                        help='reuse meshes from $BASIC_GMSH_CACHE')
+    parser.add_argument('--cache-size', default=10, type=float,
+                        help='cache size limit in GiB')
+
+    args = parser.parse_args(argv)
+
+    if (args.shape, args.cell) not in BLOCKS:
+        parser.error(f'{args.cell} cells are not available for a '
+                     f'{args.shape}')
+
+    for v in [args.nx, args.l, args.x0, args.spacing]:
+        if len(v) not in (1, DIMS[args.shape]):
+            parser.error(f'expected 1 or {DIMS[args.shape]} values per '
+                         f'option for a {args.shape}')
+
+    if min(args.nx) < 1:
+        parser.error('-n must be at least 1 along every axis')
+
+    if min(args.l) <= 0:
+        parser.error('-l must be positive along every axis')
+
+    # Anything but a named spacing is a file of points
+    try:
+        args.spacing = [s if s.partition(':')[0] in SPACINGS else
+                        np.loadtxt(s, ndmin=1).tolist() for s in args.spacing]
+        for n, s in zip(per_axis(args.nx, DIMS[args.shape]),
+                        per_axis_spacing(args.spacing, DIMS[args.shape])):
+            axis_points(n + 1, 1, 0, s)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    if args.parts is not None:
+        if args.parts < 1:
+            parser.error('--parts must be at least 1')
+        try:
+            partition_dims(args.parts, per_axis(args.nx, DIMS[args.shape]))
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.format == 'hdf5' and h5py is None:
+        parser.error('hdf5 output needs the h5py package')
+
+    if args.format in ('npz', 'hdf5') and (args.compress or args.parts):
+        parser.error('--compress and --parts are only available for MSH '
+                     'output')
+
+    if args.mmap and (args.format != '2.2' or args.parts):
+        parser.error('--mmap only writes a single MSH 2.2 file')
+
+    if args.compress and args.compress not in COMPRESSORS:
+        parser.error(f'{args.compress} compression needs the zstandard '
+                     'package')
+
+    if args.compress and args.mmap:
+        parser.error('--mmap output cannot be compressed')
+
+    if (args.periodic or args.adjacency) and args.parts:
+        parser.error('--periodic and --adjacency are not available for '
+                     'partitioned output')
+
+    if args.ordering != 'lexicographic' and (args.mmap or args.parts or
+                                             args.periodic or args.adjacency):
+        parser.error('--ordering is only available for plain single files')
+
+    if lagrange_type(args.cell, args.order) not in ETYPES:
+        parser.error(f'order {args.order} {args.cell} cells are not '
+                     'available')
+
+    if args.order != 1 and (args.mmap or args.parts or args.periodic or
+                            args.ordering != 'lexicographic'):
+        parser.error('--order is not available with --mmap, --parts, '
+                     '--periodic or --ordering')
+
+    if args.split and (args.shape, args.cell) != ('cube', 'tet'):
+        parser.error('--split is only available for cube tet cells')
+
+    if args.split == 5 and (args.order != 1 or args.adjacency):
+        parser.error('--split 5 is not available with --order or '
+                     '--adjacency')
+
+    # Opposite sides of the box only match when the cells alternate an
+    # even number of times along every axis
+    if args.split == 5 and args.periodic and any(n % 2 for n in args.nx):
+        parser.error('--split 5 with --periodic needs an even number of '
+                     'cells along every axis')
+
+    if args.validate and args.mmap:
+        parser.error('--validate needs the whole mesh in memory, so is not '
+                     'available with --mmap')
+
+    # Out-of-core output is always binary, and 12 tets is the default split
+    args.binary = args.binary or args.mmap
+    if args.split == 12:
+        args.split = None
+
+    if args.profile_memory and not args.profile:
+        args.profile = 'table'
+
+    if args.profile:
+        with profile(args.profile_memory) as records:
+            run(args)
+        print(format_records(records, args.profile), file=sys.stderr)
+    else:
+        run(args)
+
+
+def run(args):
+    nx = 'x'.join(str(n) for n in args.nx)
+    suffix = SUFFIXES.get(args.compress, '')
+    ext = EXTENSIONS[args.format]
+    cell = args.cell + (f'_split{args.split}' if args.split else '')
+    output = args.output or f'{args.shape}_{cell}_nx{nx}{ext}{suffix}'
+
+    stem = output
+    if suffix and stem.endswith(suffix):
+        stem = stem[:-len(suffix)]
+    if stem.endswith(ext):
+        stem = stem[:-len(ext)]
+
+    if args.parts:
+        mesh = make_mesh(args.shape, args.cell, args.nx, args.l, args.x0,
+                         args.spacing, split=args.split)
+        if args.validate:
+            check(mesh, args)
+        write_parts(stem, mesh, args.parts, args.binary, args.jobs,
+                    WRITERS[args.format], args.compress)
+    else:
+        write_output(args, output)
+
+    if args.adjacency:
+        with stage('adjacency'):
+            write_adjacency(f'{stem}_adjacency.npz',
+                            adjacency(args.shape, args.cell, args.nx,
+                                      args.periodic, args.split))
+
+
+def check(mesh, args):
+    # Exit listing the problems with an invalid mesh
+    try:
+        validate(mesh, np.prod(per_axis(args.l, DIMS[args.shape])))
+    except ValueError as e:
+        sys.exit(f'basic-gmsh: error: {e}')
+
+
+def generate(args, output):
+    if args.mmap:
+        with stage('write'):
+            write_mmap(output, args.shape, args.cell, args.nx, args.l,
+                       args.x0, args.periodic, args.spacing, args.split)
+    else:
+        mesh = make_mesh(args.shape, args.cell, args.nx, args.l, args.x0,
+                         args.spacing, args.order, args.split)
+        with stage('ordering'):
+            mesh = reorder(mesh, args.ordering)
+        if args.validate:
+            check(mesh, args)
+        with open_output(output, args.compress) as f:
+            WRITERS[args.format](f, mesh, args.binary, args.jobs,
+                                 args.periodic)
+
+
+def write_output(args, output):
+    # Cached meshes are hard links, so never write through one, but do write
+    # through symlinks, pipes and devices
+    try:
+        st = os.lstat(output)
+    except FileNotFoundError:
+        pass
+    else:
+        if stat.S_ISREG(st.st_mode) and st.st_nlink > 1:
+            os.remove(output)
+
+    if not args.cache:
+        generate(args, output)
+        return
+
+    # Options given once stand for every axis, so key on them per axis
+    size = args.cache_size*2**30
+    dim = DIMS[args.shape]
+    nx = per_axis(args.nx, dim)
+    key = cache.cache_key(shape=args.shape, cell=args.cell, nx=nx,
+                          l=per_axis(args.l, dim), x0=per_axis(args.x0, dim),
+                          binary=args.binary, format=args.format,
+                          periodic=args.periodic, ordering=args.ordering,
+                          spacing=per_axis_spacing(args.spacing, dim),
+                          order=args.order, compress=args.compress,
+                          split=args.split)
+    if cache.fetch(key, output):
+        return
+
+    # Entity bounding boxes come before the nodes in MSH 4.1, out-of-core
+    # output never holds the mesh, renumbered or high order nodes no longer
+    # follow mesh_nodes and compressed sections cannot be spliced, so for
+    # those only whole files are cached
+    if (args.format != '2.2' or args.mmap or args.order != 1 or
+            args.ordering != 'lexicographic' or args.compress):
+        generate(args, output)
+        cache.store(key, output, size)
+        return
+
+    # The element section does not depend on the node coordinates, so it is
+    # cached on its own and spliced in after freshly written nodes
+    ekey = cache.cache_key(section='elements', shape=args.shape,
+                           cell=args.cell, nx=nx, binary=args.binary,
+                           split=args.split)
+    elements = cache.entry(ekey)
+
+    # Validating needs the elements as well as the nodes
+    tags = make_physical_tags(args.shape, args.cell)
+    if elements and not args.validate:
+        with stage('nodes'):
+            X = mesh_nodes(args.shape, args.cell, args.nx, args.l, args.x0,
+                           args.spacing, args.split)
+    else:
+        mesh = make_mesh(args.shape, args.cell, args.nx, args.l, args.x0,
+                         args.spacing, split=args.split)
+        if args.validate:
+            check(mesh, args)
+        X = mesh.nodes
+
+    with open(output, 'wb') as f, stage('write'):
+        write_header(f, tags, args.binary)
+        write_nodes(f, X, args.binary, args.jobs)
+        if elements:
+            with open(elements, 'rb') as fe:
+                shutil.copyfileobj(fe, f)
+        else:
+            offset = f.tell()
+            write_elements(f, mesh_groups(mesh), args.binary, args.jobs)
+            end = f.tell()
+
+        if args.periodic:
+            grid = [n + 1 for n in per_axis(args.nx, DIMS[args.shape])]
+            write_periodic(f, grid, tags)
+
+    if not elements:
+        cache.store(ekey, output, size, offset=offset, end=end)
+    cache.store(key, output, size)
@@ -0,0 +1,100 @@
+import gzip
+import lzma
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Bytes compressed at a time, each block an independent gzip member, xz
+# stream or zstd frame
+BLOCK = 2**22
+
+SUFFIXES = {'gzip': '.gz', 'xz': '.xz', 'zstd': '.zst'}
+
+
+def compress_gzip(data):
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def compress_xz(data):
+    return lzma.compress(data)
+
+
+def compress_zstd(data):
+    return zstandard.ZstdCompressor().compress(data)
+
+
+COMPRESSORS = {'gzip': compress_gzip, 'xz': compress_xz}
+if zstandard is not None:
+    COMPRESSORS['zstd'] = compress_zstd
+
+
+class CompressedFile:
+    # Binary file object compressing what is written to f block by block in
+    # a pool of threads, which zlib, lzma and zstandard all run in parallel;
+    # concatenated blocks are valid compressed files
+    def __init__(self, f, method, threads=None):
+        self.f = f
+        self.compress = COMPRESSORS[method]
+        self.threads = threads or os.cpu_count() or 1
+        self.pool = ThreadPoolExecutor(self.threads)
+        self.window = deque()
+        self.parts = []
+        self.pending = 0
+        self.size = 0
+
+    def write(self, data):
+        n = len(data)
+        self.parts.append(bytes(data))
+        self.pending += n
+        self.size += n
+        if self.pending >= BLOCK:
+            data = b''.join(self.parts)
+            end = len(data) - len(data) % BLOCK
+            for i in range(0, end, BLOCK):
+                self.submit(data[i:i + BLOCK])
+            self.parts = [data[end:]]
+            self.pending = len(data) - end
+
+        return n
+
+    def submit(self, block):
+        # Only a couple of blocks per thread are held at a time
+        self.window.append(self.pool.submit(self.compress, block))
+        while len(self.window) > 2*self.threads:
+            self.f.write(self.window.popleft().result())
+
+    def tell(self):
+        # Uncompressed position
+        return self.size
+
+    def close(self):
+        if self.pending:
+            self.submit(b''.join(self.parts))
+            self.parts, self.pending = [], 0
+
+        while self.window:
+            self.f.write(self.window.popleft().result())
+        self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@contextmanager
+def open_output(path, method=None, threads=None):
+    # Binary output file, compressed on the fly unless method is None
+    with open(path, 'wb') as f:
+        if method is None:
+            yield f
+        else:
+            with CompressedFile(f, method, threads) as z:
+                yield z
@@ -0,0 +1,113 @@
+from functools import reduce
+
+import numpy as np
+
+# Marks the cell centroid node in a cell template
+MID = None
+
+
+def grid_index(nx, ny, i, j, k):
+    return k*nx*ny + j*nx + i + 1
+
+
+def grid_strides(shape):
+    return np.cumprod((1,) + tuple(shape[:-1]))
+
+
+def grid_base(counts, strides, lo=0, hi=None):
+    # Index of the lowest corner of every cell in layers [lo, hi) of the
+    # last axis, first axis fastest
+    counts = list(counts[:-1]) + [(counts[-1] if hi is None else hi) - lo]
+    axes = [np.arange(n)*s for n, s in zip(counts[::-1], strides[::-1])]
+    return reduce(np.add, np.ix_(*axes)).ravel() + lo*strides[-1] + 1
+
+
+def cell_parity(counts, lo=0, hi=None, start=0):
+    # Whether the index of every cell in layers [lo, hi) of the last axis
+    # adds up to an odd number, first axis fastest
+    counts = list(counts[:-1]) + [(counts[-1] if hi is None else hi) - lo]
+    axes = [np.arange(n) for n in counts[::-1]]
+    return (reduce(np.add, np.ix_(*axes)).ravel() + lo + start) % 2 == 1
+
+
+def mirror(template):
+    # Template mirrored along its first axis, with the first two nodes of
+    # every element swapped to keep its orientation
+    return [[v if v is MID else (1 - v[0],) + tuple(v[1:])
+             for v in (e[1], e[0], *e[2:])] for e in template]
+
+
+def cell_connectivity(shape, template, lo=0, hi=None, alternate=False):
+    counts = [n - 1 for n in shape]
+    strides = grid_strides(shape)
+    base = grid_base(counts, strides, lo, hi)
+
+    mask = np.array([[v is MID for v in e] for e in template])
+    offs = np.array([[0 if v is MID else np.dot(v, strides) for v in e]
+                     for e in template])
+
+    conn = base[:, None, None] + offs
+    if mask.any():
+        mid = np.prod(shape) + lo*np.prod(counts[:-1])
+        mid += np.arange(1, len(base) + 1)
+        conn[:, mask] = mid[:, None]
+
+    if alternate:
+        odd = cell_parity(counts, lo, hi)
+        conn[odd] = cell_connectivity(shape, mirror(template), lo,
+                                      hi).reshape(conn.shape)[odd]
+
+    return conn.reshape(-1, offs.shape[-1])
+
+
+def face_connectivity(shape, axis, side, template, lo=0, hi=None,
+                      alternate=False):
+    free = [a for a in range(len(shape)) if a != axis]
+    strides = grid_strides(shape)
+    base = grid_base([shape[a] - 1 for a in free], strides[free], lo, hi)
+    base += side*(shape[axis] - 1)*strides[axis]
+
+    offs = np.array(template) @ strides[free]
+
+    conn = base[:, None, None] + offs
+    if alternate:
+        # Parity of the cell each face belongs to
+        odd = cell_parity([shape[a] - 1 for a in free], lo, hi,
+                          side*(shape[axis] - 2))
+        conn[odd] = face_connectivity(shape, axis, side, mirror(template),
+                                      lo, hi).reshape(conn.shape)[odd]
+
+    return conn.reshape(-1, offs.shape[-1])
+
+
+def block_grid(shape, block):
+    # Cell counts of the grid the elements of a block are laid out on
+    if block.axis is None:
+        return [n - 1 for n in shape]
+    else:
+        return [shape[a] - 1 for a in range(len(shape)) if a != block.axis]
+
+
+def block_connectivity(shape, block, lo=0, hi=None):
+    if block.axis is None:
+        return cell_connectivity(shape, block.template, lo, hi,
+                                 block.alternate)
+    else:
+        return face_connectivity(shape, block.axis, block.side,
+                                 block.template, lo, hi, block.alternate)
+
+
+def index_coords(grid, nodes):
+    # Position of one-based node indices in index space, with centroid
+    # nodes at the centre of their cell
+    nodes = np.asarray(nodes) - 1
+    counts = np.array(grid) - 1
+    npts = np.prod(grid)
+
+    mid = nodes >= npts
+    n = np.where(mid, nodes - npts, nodes)[..., None]
+
+    x = (n // grid_strides(grid)) % grid
+    m = (n // grid_strides(counts)) % counts + 0.5
+
+    return np.where(mid[..., None], m, x)
@@ -0,0 +1,56 @@
+import numpy as np
+
+from basic_gmsh.cells import FACES
+from basic_gmsh.periodic import periodic_pairs
+from basic_gmsh.profile import stage
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+
+def mesh_datasets(mesh, periodic=False):
+    # Nodes, the connectivity of every element type with the boundary faces
+    # first, the rows of each physical group within the connectivity of its
+    # type, a table of the groups and optionally the periodic node pairs
+    groups = [(name, FACES[mesh.dim][conn.shape[1]], conn)
+              for name, conn in mesh.boundary_faces.items()]
+    groups += [(mesh.volume_name, ctype, conn)
+               for ctype, conn in mesh.connectivity.items()]
+
+    data = {'nodes': mesh.nodes}
+    types = {}
+    for name, ctype, conn in groups:
+        start = sum(len(c) for c in types.get(ctype, []))
+        types.setdefault(ctype, []).append(conn)
+        data[name] = np.arange(start, start + len(conn))
+
+    for ctype, conns in types.items():
+        data[ctype] = np.concatenate(conns).astype(np.int32)
+
+    size = max(len(n) for n, t, c in groups)
+    table = np.array([(name, ctype, *mesh.physical_tags[name])
+                      for name, ctype, conn in groups],
+                     dtype=[('name', f'S{size}'), ('type', 'S8'),
+                            ('dim', 'i4'), ('tag', 'i4'),
+                            ('elementary', 'i4')])
+    data['physical_groups'] = table
+
+    if periodic:
+        for a, pairs in periodic_pairs(mesh.grid).items():
+            data[f'periodic_{a}'] = pairs
+
+    return data
+
+
+def write_npz(f, mesh, binary=False, jobs=1, periodic=False):
+    # Always binary, and written in one process
+    with stage('write'):
+        np.savez(f, **mesh_datasets(mesh, periodic))
+
+
+def write_hdf5(f, mesh, binary=False, jobs=1, periodic=False):
+    with stage('write'), h5py.File(f, 'w') as h:
+        for name, values in mesh_datasets(mesh, periodic).items():
+            h.create_dataset(name, data=values)
@@ -0,0 +1,135 @@
+import numpy as np
+
+from basic_gmsh.cells import CELL_EDGES, CELL_FACES, FACES
+from basic_gmsh.connectivity import MID, grid_base, grid_strides
+from basic_gmsh.nodes import grid_points
+
+# Vertex opposite each vertex of a box
+OPPOSITE = {'quad': [2, 3, 0, 1], 'hex': [6, 7, 4, 5, 2, 3, 0, 1]}
+
+
+def interior_points(cell_type, P, p):
+    # Nodes strictly inside an order p element, which gmsh orders as an
+    # element of lower order with its vertices moved inwards
+    if cell_type in ('tri', 'tet'):
+        q = p - len(P)
+        inner = P + (P.sum(axis=0) - len(P)*P) / p
+    elif cell_type in OPPOSITE:
+        q = p - 2
+        inner = P + (P[OPPOSITE[cell_type]] - P) / p
+    elif cell_type == 'pyr':
+        q = p - 3
+        c = P[:4].mean(axis=0)
+        inner = c + (P - c)*q/p + (P[4] - c)/p
+    else:
+        # Lines have all their nodes on their edge, and prisms are only
+        # available up to second order, which has none inside
+        q = -1
+
+    if q < 0:
+        return np.empty((0, P.shape[1]))
+    else:
+        return lagrange_points(cell_type, inner, q)
+
+
+def lagrange_points(cell_type, P, p):
+    # Nodes of an order p element with vertices P in gmsh order: vertices,
+    # points along each edge, the insides of the faces, then the inside
+    P = np.asarray(P, dtype=float)
+    if p == 0:
+        return P.mean(axis=0, keepdims=True)
+
+    t = np.arange(1, p)[:, None] / p
+    X = [P] + [P[a] + t*(P[b] - P[a]) for a, b in CELL_EDGES[cell_type]]
+
+    if cell_type in CELL_FACES and len(CELL_FACES[cell_type][0]) > 2:
+        X += [interior_points(FACES[3][len(f)], P[list(f)], p)
+              for f in CELL_FACES[cell_type]]
+
+    X.append(interior_points(cell_type, P, p))
+
+    return np.vstack(X)
+
+
+def lagrange_type(cell_type, order):
+    if order == 1:
+        return cell_type
+
+    # Named by the number of nodes
+    n = max(max(e) for e in CELL_EDGES[cell_type]) + 1
+    nodes = lagrange_points(cell_type, np.zeros((n, 1)), order)
+
+    return f'{cell_type}{len(nodes)}'
+
+
+def block_offsets(block, cell_type, order, R):
+    # Offsets of the nodes of every element of a block from the lowest
+    # corner of its cell, in 1/R cells
+    if block.axis is None:
+        dim = len(next(v for v in block.template[0] if v is not MID))
+        elements = block.template
+    else:
+        dim = len(block.template[0][0]) + 1
+        cell_type = FACES[dim][len(block.template[0])]
+        elements = [[v[:block.axis] + (block.side,) + v[block.axis:]
+                     for v in e] for e in block.template]
+
+    X = np.array([lagrange_points(cell_type,
+                                  [np.full(dim, R/2) if v is MID else
+                                   np.multiply(v, R) for v in e], order)
+                  for e in elements])
+
+    return np.rint(X).astype(int)
+
+
+def node_classes(offsets, R):
+    # Offsets within a cell used by any element, each numbering a grid of
+    # nodes of its own, the grid points first
+    res = {tuple(r) for o in offsets
+           for r in (o.reshape(-1, o.shape[-1]) % R).tolist()}
+
+    return sorted(res, key=lambda r: (any(r), r[::-1]))
+
+
+def class_grids(counts, classes):
+    # Grid of nodes of each class, and the node before the first of each
+    shapes = [[c + (r == 0) for c, r in zip(counts, res)] for res in classes]
+    starts = np.cumsum([0] + [int(np.prod(s)) for s in shapes[:-1]])
+
+    return shapes, starts
+
+
+def lagrange_nodes(axes, classes, R):
+    # Coordinates of every class of nodes, from the points along each axis
+    X = []
+    for res in classes:
+        X.append(grid_points([x if r == 0 else x[:-1] + (r / R)*np.diff(x)
+                              for x, r in zip(axes, res)]))
+
+    return np.vstack(X)
+
+
+def lagrange_connectivity(counts, classes, R, offsets, axis=None, side=None):
+    # Node numbers of the elements with the given offsets in every cell, or
+    # in every cell on one side of the grid
+    shapes, starts = class_grids(counts, classes)
+    strides = [grid_strides(s) for s in shapes]
+    index = {res: i for i, res in enumerate(classes)}
+
+    free = [a for a in range(len(counts)) if a != axis]
+    bases = []
+    for s in strides:
+        base = grid_base([counts[a] for a in free], s[free]) - 1
+        if axis is not None:
+            base += side*(counts[axis] - 1)*s[axis]
+        bases.append(base)
+
+    n, k = offsets.shape[:2]
+    conn = np.empty((len(bases[0]), n, k), dtype=np.int64)
+    for e in range(n):
+        for j in range(k):
+            o = offsets[e, j]
+            c = index[tuple((o % R).tolist())]
+            conn[:, e, j] = starts[c] + bases[c] + np.dot(o // R, strides[c])
+
+    return conn.reshape(-1, k) + 1
@@ -0,0 +1,207 @@
+import numpy as np
+
+from basic_gmsh.cells import BLOCKS, DIMS, ETYPES, NAMES, TET_SPLITS
+from basic_gmsh.connectivity import MID, block_connectivity
+from basic_gmsh.highorder import (block_offsets, lagrange_connectivity,
+                                  lagrange_nodes, lagrange_type,
+                                  node_classes)
+from basic_gmsh.nodes import axis_points, cell_centres, grid_points
+from basic_gmsh.profile import stage
+
+
+class Mesh:
+    # nodes: float64[N, 3]
+    # connectivity: {cell type: int32[M, k]} for the volume
+    # physical_tags: {name: (dim, physical tag, elementary tag)}
+    # boundary_faces: {name: int32[F, k]}
+    # grid: grid points per axis, or None if the mesh is not a full grid
+    __slots__ = ('nodes', 'connectivity', 'physical_tags', 'boundary_faces',
+                 'grid')
+
+    def __init__(self, nodes, connectivity, physical_tags, boundary_faces,
+                 grid=None):
+        self.nodes = nodes
+        self.connectivity = connectivity
+        self.physical_tags = physical_tags
+        self.boundary_faces = boundary_faces
+        self.grid = grid
+
+    @property
+    def dim(self):
+        return max(d for d, p, e in self.physical_tags.values())
+
+    @property
+    def volume_name(self):
+        return next(n for n, (d, p, e) in self.physical_tags.items()
+                    if d == self.dim)
+
+
+def has_mid(blocks):
+    return any(v is MID for b in blocks for e in b.template for v in e)
+
+
+def volume_block(blocks):
+    # The one block of volume elements, laid out one group per cell
+    volumes = [b for b in blocks if b.axis is None]
+    assert len(volumes) == 1, 'Expected a single volume block'
+    return volumes[0]
+
+
+def cell_blocks(shape, cell_type, split=None):
+    # Blocks of a mesh, with split picking how many tets each cube cell is
+    # cut into
+    if split is None:
+        return BLOCKS[shape, cell_type]
+    if (shape, cell_type) != ('cube', 'tet') or split not in TET_SPLITS:
+        raise ValueError(f'No split of {shape} {cell_type} cells into '
+                         f'{split} elements')
+
+    return TET_SPLITS[split]
+
+
+def per_axis_spacing(spacing, dim):
+    # A spacing is a name or an array of points, given once or per axis
+    if isinstance(spacing, str) or all(
+            np.isscalar(s) and not isinstance(s, str) for s in spacing):
+        spacing = [spacing]
+
+    if len(spacing) == 1:
+        return tuple(spacing)*dim
+    elif len(spacing) == dim:
+        return tuple(spacing)
+    else:
+        raise ValueError(f'Expected 1 or {dim} spacings, got {len(spacing)}')
+
+
+def per_axis(v, dim):
+    v = tuple(np.atleast_1d(v).tolist())
+    if len(v) == 1:
+        return v*dim
+    elif len(v) == dim:
+        return v
+    else:
+        raise ValueError(f'Expected 1 or {dim} values, got {len(v)}')
+
+
+def make_nodes(npts, l, x0, mid=False, spacing=('uniform',)*3):
+    R = [axis_points(n, b, a, s) for n, b, a, s in zip(npts, l, x0, spacing)]
+    X = grid_points(R)
+
+    if mid:
+        X = np.vstack([X, grid_points([cell_centres(r) for r in R])])
+
+    return X
+
+
+def make_physical_tags(shape, cell_type):
+    elem = {b.phys: b.elem for b in BLOCKS[shape, cell_type]}
+    return {name: (dim, tag, elem[tag]) for dim, tag, name in NAMES[shape]}
+
+
+def mesh_nodes(shape, cell_type, nx, l=1, x0=0, spacing='uniform',
+               split=None):
+    # Just the node array of make_mesh
+    dim = DIMS[shape]
+    npts = tuple(n + 1 for n in per_axis(nx, dim))
+    l, x0 = per_axis(l, dim), per_axis(x0, dim)
+    spacing = per_axis_spacing(spacing, dim)
+
+    return make_nodes(npts, l, x0,
+                      has_mid(cell_blocks(shape, cell_type, split)), spacing)
+
+
+def make_mesh(shape, cell_type, nx, l=1, x0=0, spacing='uniform', order=1,
+              split=None):
+    # nx, l, x0 and spacing may be given once or per axis
+    if order != 1:
+        return make_lagrange_mesh(shape, cell_type, nx, l, x0, spacing, order,
+                                  split)
+
+    physical_tags, boundary_faces, connectivity = mesh_elements(
+        shape, cell_type, nx, split)
+
+    with stage('nodes'):
+        X = mesh_nodes(shape, cell_type, nx, l, x0, spacing, split)
+
+    npts = tuple(n + 1 for n in per_axis(nx, DIMS[shape]))
+    return Mesh(X, connectivity, physical_tags, boundary_faces, npts)
+
+
+def mesh_elements(shape, cell_type, nx, split=None):
+    # The physical tags, boundary faces and volume connectivity of make_mesh
+    blocks = cell_blocks(shape, cell_type, split)
+    npts = tuple(n + 1 for n in per_axis(nx, DIMS[shape]))
+
+    with stage('header'):
+        names = {tag: name for dim, tag, name in NAMES[shape]}
+        physical_tags = make_physical_tags(shape, cell_type)
+
+    with stage('boundaries'):
+        boundary_faces = {names[b.phys]: block_connectivity(npts, b)
+                          .astype(np.int32) for b in blocks
+                          if b.axis is not None}
+
+    with stage('elements'):
+        volume = volume_block(blocks)
+        connectivity = {cell_type: block_connectivity(npts, volume)
+                        .astype(np.int32)}
+
+    return physical_tags, boundary_faces, connectivity
+
+
+def make_lagrange_mesh(shape, cell_type, nx, l=1, x0=0, spacing='uniform',
+                       order=2, split=None):
+    # Order p Lagrange elements on the same cells, with their nodes on the
+    # grid refined R times that takes them all. The nodes at each offset
+    # within a cell form a grid of their own, numbered one after the other,
+    # so neighbours share nodes by construction
+    dim = DIMS[shape]
+    blocks = cell_blocks(shape, cell_type, split)
+    if any(b.alternate for b in blocks):
+        raise ValueError('Lagrange elements need every cell split alike')
+    npts = tuple(n + 1 for n in per_axis(nx, dim))
+    counts = [n - 1 for n in npts]
+    l, x0 = per_axis(l, dim), per_axis(x0, dim)
+    spacing = per_axis_spacing(spacing, dim)
+    R = order*(2 if has_mid(blocks) else 1)
+
+    ctype = lagrange_type(cell_type, order)
+    if ctype not in ETYPES:
+        raise ValueError(f'Order {order} {cell_type} cells are not available')
+
+    with stage('header'):
+        names = {tag: name for dim, tag, name in NAMES[shape]}
+        physical_tags = make_physical_tags(shape, cell_type)
+
+    offsets = [block_offsets(b, cell_type, order, R) for b in blocks]
+    classes = node_classes(offsets, R)
+
+    with stage('boundaries'):
+        boundary_faces = {names[b.phys]: lagrange_connectivity(
+            counts, classes, R, o, b.axis, b.side).astype(np.int32)
+            for b, o in zip(blocks, offsets) if b.axis is not None}
+
+    with stage('elements'):
+        o = offsets[blocks.index(volume_block(blocks))]
+        connectivity = {ctype: lagrange_connectivity(
+            counts, classes, R, o).astype(np.int32)}
+
+    with stage('nodes'):
+        axes = [axis_points(n, b, a, s)
+                for n, b, a, s in zip(npts, l, x0, spacing)]
+        X = lagrange_nodes(axes, classes, R)
+
+    return Mesh(X, connectivity, physical_tags, boundary_faces)
+
+
+def rescale(mesh, l, x0):
+    # Map a mesh onto the box of extent l at x0, sharing its connectivity
+    dim = mesh.dim
+    l, x0 = per_axis(l, dim), per_axis(x0, dim)
+
+    X = mesh.nodes.copy()
+    lo, hi = X[:, :dim].min(axis=0), X[:, :dim].max(axis=0)
+    X[:, :dim] = x0 + (X[:, :dim] - lo)*(np.array(l) / (hi - lo))
+
+    return Mesh(X, mesh.connectivity, mesh.physical_tags,
+                mesh.boundary_faces, mesh.grid)
@@ -0,0 +1,151 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from basic_gmsh.cells import ETYPES, FACES
+from basic_gmsh.periodic import periodic_links
+from basic_gmsh.profile import stage
+
+# Target number of rows formatted and written at a time
+CHUNK = 2**16
+
+
+def format_rows(fmt, rows):
+    if len(rows):
+        return ((fmt*len(rows)) % tuple(rows.ravel().tolist())).encode()
+    else:
+        return b''
+
+
+def format_nodes(start, x, binary=False):
+    ids = np.arange(start, start + len(x))
+
+    if binary:
+        rec = np.dtype([('id', np.int32), ('x', np.float64, x.shape[1:])])
+        data = np.empty(len(x), dtype=rec)
+        data['id'], data['x'] = ids, x
+        return data.tobytes()
+    else:
+        fmt = '%d' + ' %r'*x.shape[1] + '\n'
+        return format_rows(fmt, np.column_stack([ids, x]))
+
+
+def format_elements(start, etype, phys, elem, conn, binary=False):
+    ids = np.arange(start, start + len(conn))
+
+    if binary:
+        # Type NumElm NumTags, then Id PhysGrp ElemGrp IndexList
+        head = [etype, len(conn), 2]
+        data = np.column_stack([ids, np.full_like(ids, phys),
+                                np.full_like(ids, elem), conn])
+        return (np.array(head, dtype=np.int32).tobytes() +
+                data.astype(np.int32).tobytes())
+    else:
+        # Id Type NumTags PhysGrp ElemGrp IndexList
+        fmt = f'%d {etype} 2 {phys} {elem}' + ' %d'*conn.shape[1] + '\n'
+        return format_rows(fmt, np.column_stack([ids, conn]))
+
+
+def map_chunks(tasks, jobs=1):
+    # Run (func, *args) tasks, yielding their results in order; in parallel
+    # only a couple of tasks per worker are in flight at a time
+    if jobs <= 1:
+        for func, *args in tasks:
+            yield func(*args)
+        return
+
+    with ProcessPoolExecutor(jobs) as pool:
+        window = deque()
+        for func, *args in tasks:
+            window.append(pool.submit(func, *args))
+            if len(window) >= 2*jobs:
+                yield window.popleft().result()
+
+        while window:
+            yield window.popleft().result()
+
+
+def write_format(f, binary=False):
+    f.write(f'$MeshFormat\n2.2 {int(binary)} 8\n'.encode())
+    if binary:
+        f.write(np.int32(1).tobytes() + b'\n')
+    f.write(b'$EndMeshFormat\n')
+
+
+def write_names(f, names):
+    f.write(f'$PhysicalNames\n{len(names)}\n'.encode())
+    for dim, tag, name in names:
+        f.write(f'{dim} {tag} "{name}"\n'.encode())
+    f.write(b'$EndPhysicalNames\n')
+
+
+def write_nodes(f, X, binary=False, jobs=1):
+    f.write(f'$Nodes\n{len(X)}\n'.encode())
+
+    tasks = ((format_nodes, i + 1, X[i:i + CHUNK], binary)
+             for i in range(0, len(X), CHUNK))
+    for data in map_chunks(tasks, jobs):
+        f.write(data)
+
+    f.write(b'\n$EndNodes\n' if binary else b'$EndNodes\n')
+
+
+def mesh_groups(mesh):
+    # Type PhysGrp ElemGrp and connectivity of each group of elements, with
+    # the boundary faces first
+    for name, conn in mesh.boundary_faces.items():
+        dim, phys, elem = mesh.physical_tags[name]
+        yield ETYPES[FACES[mesh.dim][conn.shape[1]]], phys, elem, conn
+
+    dim, phys, elem = mesh.physical_tags[mesh.volume_name]
+    for ctype, conn in mesh.connectivity.items():
+        yield ETYPES[ctype], phys, elem, conn
+
+
+def element_tasks(groups, binary=False):
+    # Element numbers of every chunk are known up front, so chunks can be
+    # formatted independently
+    nele = 0
+    for etype, phys, elem, conn in groups:
+        for i in range(0, len(conn), CHUNK):
+            yield (format_elements, nele + i + 1, etype, phys, elem,
+                   conn[i:i + CHUNK], binary)
+        nele += len(conn)
+
+
+def write_elements(f, groups, binary=False, jobs=1):
+    groups = list(groups)
+    f.write(f'$Elements\n{sum(len(g[-1]) for g in groups)}\n'.encode())
+
+    for data in map_chunks(element_tasks(groups, binary), jobs):
+        f.write(data)
+
+    f.write(b'\n$EndElements\n' if binary else b'$EndElements\n')
+
+
+def write_periodic(f, grid, physical_tags):
+    # Always ASCII, even in binary files
+    links = list(periodic_links(grid, physical_tags))
+
+    f.write(f'$Periodic\n{len(links)}\n'.encode())
+    for dim, slave, master, pairs in links:
+        f.write(f'{dim} {slave} {master}\n{len(pairs)}\n'.encode())
+        for i in range(0, len(pairs), CHUNK):
+            f.write(format_rows('%d %d\n', pairs[i:i + CHUNK]))
+    f.write(b'$EndPeriodic\n')
+
+
+def write_header(f, physical_tags, binary=False):
+    write_format(f, binary)
+    write_names(f, [(d, p, n) for n, (d, p, e) in physical_tags.items()])
+
+
+def write_msh(f, mesh, binary=False, jobs=1, periodic=False):
+    with stage('write'):
+        write_header(f, mesh.physical_tags, binary)
+        write_nodes(f, mesh.nodes, binary, jobs)
+        write_elements(f, mesh_groups(mesh), binary, jobs)
+
+        if periodic:
+            write_periodic(f, mesh.grid, mesh.physical_tags)
@@ -0,0 +1,146 @@
+import numpy as np
+
+from basic_gmsh.msh import (CHUNK, format_rows, map_chunks, mesh_groups,
+                            write_names)
+from basic_gmsh.periodic import periodic_links
+from basic_gmsh.profile import stage
+
+
+def format_ints(rows, binary=False):
+    if binary:
+        return rows.astype(np.uint64).tobytes()
+    else:
+        return format_rows('%d' + ' %d'*(rows.shape[1] - 1) + '\n', rows)
+
+
+def format_coords(x, binary=False):
+    if binary:
+        return np.ascontiguousarray(x, dtype=np.float64).tobytes()
+    else:
+        return format_rows('%r' + ' %r'*(x.shape[1] - 1) + '\n', x)
+
+
+def format_elements(start, conn, binary=False):
+    ids = np.arange(start, start + len(conn))
+    return format_ints(np.column_stack([ids, conn]), binary)
+
+
+def write_line(f, values, binary=False, dtypes=None):
+    # A header line of mixed ints, sizes and doubles
+    if binary:
+        f.write(b''.join(np.array(v, dtype=t).tobytes()
+                         for v, t in zip(values, dtypes)))
+    else:
+        f.write((' '.join(str(v) for v in values) + '\n').encode())
+
+
+def write_format(f, binary=False):
+    f.write(f'$MeshFormat\n4.1 {int(binary)} 8\n'.encode())
+    if binary:
+        f.write(np.int32(1).tobytes() + b'\n')
+    f.write(b'$EndMeshFormat\n')
+
+
+def mesh_entities(mesh):
+    # Entity dimension and tag, element type, physical tag and connectivity
+    # of each non-empty group, with one entity per physical group
+    dims = {p: d for d, p, e in mesh.physical_tags.values()}
+    for etype, phys, elem, conn in mesh_groups(mesh):
+        if len(conn):
+            yield dims[phys], elem, etype, phys, conn
+
+
+def write_entities(f, mesh, binary=False):
+    entities = list(mesh_entities(mesh))
+    counts = [sum(1 for e in entities if e[0] == d) for d in range(4)]
+
+    f.write(b'$Entities\n')
+    write_line(f, counts, binary, ['u8']*4)
+
+    for dim, tag, etype, phys, conn in sorted(entities, key=lambda e: e[0]):
+        # The volume holds every node, and boundary groups are small
+        # enough to gather without sorting out repeated nodes
+        x = mesh.nodes if dim == mesh.dim else mesh.nodes[conn.ravel() - 1]
+        box = [*x.min(axis=0), *x.max(axis=0)]
+
+        # Tag, bounding box, physical tags and no bounding entities
+        write_line(f, [tag, *box, 1, phys, 0], binary,
+                   ['i4'] + ['f8']*6 + ['u8', 'i4', 'u8'])
+
+    f.write(b'\n$EndEntities\n' if binary else b'$EndEntities\n')
+
+
+def write_nodes(f, mesh, binary=False, jobs=1):
+    # Every node is placed in the volume entity as one block
+    X = mesh.nodes
+    dim, phys, elem = mesh.physical_tags[mesh.volume_name]
+
+    f.write(b'$Nodes\n')
+    write_line(f, [1, len(X), 1, len(X)], binary, ['u8']*4)
+    write_line(f, [dim, elem, 0, len(X)], binary, ['i4']*3 + ['u8'])
+
+    # Node tags, then coordinates
+    ids = np.arange(1, len(X) + 1)[:, None]
+    tasks = [(format_ints, ids[i:i + CHUNK], binary)
+             for i in range(0, len(X), CHUNK)]
+    tasks += [(format_coords, X[i:i + CHUNK], binary)
+              for i in range(0, len(X), CHUNK)]
+    for data in map_chunks(tasks, jobs):
+        f.write(data)
+
+    f.write(b'\n$EndNodes\n' if binary else b'$EndNodes\n')
+
+
+def write_elements(f, mesh, binary=False, jobs=1):
+    entities = list(mesh_entities(mesh))
+    nele = sum(len(e[-1]) for e in entities)
+
+    f.write(b'$Elements\n')
+    write_line(f, [len(entities), nele, 1, nele], binary, ['u8']*4)
+
+    nele = 0
+    for dim, tag, etype, phys, conn in entities:
+        write_line(f, [dim, tag, etype, len(conn)], binary,
+                   ['i4']*3 + ['u8'])
+
+        tasks = ((format_elements, nele + i + 1, conn[i:i + CHUNK], binary)
+                 for i in range(0, len(conn), CHUNK))
+        for data in map_chunks(tasks, jobs):
+            f.write(data)
+
+        nele += len(conn)
+
+    f.write(b'\n$EndElements\n' if binary else b'$EndElements\n')
+
+
+def write_periodic(f, mesh, binary=False):
+    links = list(periodic_links(mesh.grid, mesh.physical_tags))
+
+    f.write(b'$Periodic\n')
+    write_line(f, [len(links)], binary, ['u8'])
+
+    for dim, slave, master, pairs in links:
+        # Translation taking the master face onto the slave
+        affine = np.eye(4)
+        affine[:3, 3] = np.subtract(*mesh.nodes[pairs[0] - 1])
+
+        write_line(f, [dim, slave, master], binary, ['i4']*3)
+        write_line(f, [16, *affine.ravel()], binary, ['u8'] + ['f8']*16)
+        write_line(f, [len(pairs)], binary, ['u8'])
+        for i in range(0, len(pairs), CHUNK):
+            f.write(format_ints(pairs[i:i + CHUNK], binary))
+
+    f.write(b'\n$EndPeriodic\n' if binary else b'$EndPeriodic\n')
+
+
+def write_msh4(f, mesh, binary=False, jobs=1, periodic=False):
+    with stage('write'):
+        write_format(f, binary)
+        names = [(d, p, n) for n, (d, p, e) in mesh.physical_tags.items()]
+        write_names(f, names)
+        write_entities(f, mesh, binary)
+        write_nodes(f, mesh, binary, jobs)
+        write_elements(f, mesh, binary, jobs)
+
+        if periodic:
+            write_periodic(f, mesh, binary)
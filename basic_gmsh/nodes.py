@@ -0,0 +1,58 @@
+import numpy as np
+
+# Named spacings of the points along an axis
+SPACINGS = ['uniform', 'geometric', 'tanh', 'chebyshev']
+
+
+def grid_points(axes):
+    # Tensor product of the axis coordinates, first axis fastest, padded
+    # to three dimensions to match grid_index
+    X = list(np.meshgrid(*axes[::-1], indexing='ij'))[::-1]
+    X += [np.zeros_like(X[0])]*(3 - len(axes))
+
+    return np.stack(X, axis=-1).reshape(-1, 3)
+
+
+def unit_points(n, spacing):
+    # n increasing points from 0 to 1, from the name of a spacing with an
+    # optional :parameter, or from given points
+    if not isinstance(spacing, str):
+        x = np.asarray(spacing, dtype=float)
+        if x.shape != (n,) or np.any(np.diff(x) <= 0):
+            raise ValueError(f'Expected {n} increasing points, got '
+                             f'{x.shape[0] if x.ndim else 0}')
+        return (x - x[0]) / (x[-1] - x[0])
+
+    name, _, arg = spacing.partition(':')
+    s = np.linspace(0, 1, n)
+
+    if name == 'uniform':
+        return s
+    elif name == 'geometric':
+        # Each cell arg times the size of the one before
+        r = float(arg or 1.1)
+        if r <= 0:
+            raise ValueError(f'Geometric ratio must be positive, got {r!r}')
+        k = np.log(r)*(n - 1)
+        return np.expm1(k*s) / np.expm1(k) if k else s
+    elif name == 'tanh':
+        # Clustered towards both ends, more so for larger arg
+        beta = float(arg or 2)
+        if beta == 0:
+            raise ValueError('Tanh clustering must be non-zero')
+        return 0.5*(1 + np.tanh(beta*(2*s - 1)) / np.tanh(beta))
+    elif name == 'chebyshev':
+        return 0.5*(1 - np.cos(np.pi*s))
+    else:
+        raise ValueError(f'Unknown spacing {spacing!r}')
+
+
+def axis_points(n, l, x0, spacing='uniform'):
+    if isinstance(spacing, str) and spacing == 'uniform':
+        return np.linspace(x0, x0 + l, n)
+    else:
+        return x0 + l*unit_points(n, spacing)
+
+
+def cell_centres(r):
+    return 0.5*(r[:-1] + r[1:])
@@ -0,0 +1,101 @@
+import numpy as np
+
+from basic_gmsh.connectivity import index_coords
+from basic_gmsh.mesh import Mesh
+from basic_gmsh.partition import element_cells
+
+# Cells along each side of a tile of the blocked ordering
+TILE = 8
+
+
+def interleave(x, bits):
+    # Key made of the bits of every coordinate, most significant first and
+    # the last axis first within each bit
+    key = np.zeros(len(x), dtype=np.uint64)
+    for b in range(bits - 1, -1, -1):
+        for a in range(x.shape[1] - 1, -1, -1):
+            key = (key << np.uint64(1)) | ((x[:, a] >> np.uint64(b)) &
+                                           np.uint64(1))
+    return key
+
+
+def hilbert_keys(x, bits):
+    # Skilling's transform of the coordinates to the transposed Hilbert
+    # index, last axis first
+    X = [c.copy() for c in x.T[::-1]]
+    one = np.uint64(1)
+
+    q = one << np.uint64(bits - 1)
+    while q > one:
+        p = q - one
+        for i in range(len(X)):
+            hi = (X[i] & q) != 0
+            X[0] = np.where(hi, X[0] ^ p, X[0])
+            t = np.where(hi, np.uint64(0), (X[0] ^ X[i]) & p)
+            X[0] ^= t
+            X[i] ^= t
+        q >>= one
+
+    for i in range(1, len(X)):
+        X[i] ^= X[i - 1]
+
+    t = np.zeros_like(X[0])
+    q = one << np.uint64(bits - 1)
+    while q > one:
+        t = np.where((X[-1] & q) != 0, t ^ (q - one), t)
+        q >>= one
+    for i in range(len(X)):
+        X[i] ^= t
+
+    return interleave(np.column_stack(X[::-1]), bits)
+
+
+def blocked_keys(x, bits):
+    # Tiles of TILE cells per side in lexicographic order, and the points
+    # of each tile in lexicographic order
+    size = 2*TILE
+    x = x.astype(np.int64)
+    tiles = x // size
+
+    tile = np.ravel_multi_index(tiles.T, tiles.max(axis=0) + 1, order='F')
+    inner = np.ravel_multi_index((x % size).T, (size,)*x.shape[1],
+                                 order='F')
+
+    return tile.astype(np.uint64)*np.uint64(size**x.shape[1]) + inner
+
+
+KEYS = {'morton': interleave, 'hilbert': hilbert_keys,
+        'blocked': blocked_keys}
+
+
+def curve_keys(x, ordering, bits):
+    # Position along the curve of points on the lattice of half cells
+    return KEYS[ordering](np.asarray(x, dtype=np.uint64), bits)
+
+
+def reorder(mesh, ordering):
+    # Renumber the nodes of a structured mesh along a space filling curve,
+    # with each centroid node between the vertices of its cell, and sort
+    # the elements of every group by the cell they lie in
+    if ordering == 'lexicographic':
+        return mesh
+
+    grid = mesh.grid
+    bits = max(2*(max(grid) - 1), 1).bit_length()
+
+    nodes = np.arange(1, len(mesh.nodes) + 1)
+    key = curve_keys(2*index_coords(grid, nodes), ordering, bits)
+
+    perm = np.argsort(key, kind='stable')
+    new = np.empty_like(perm)
+    new[perm] = np.arange(1, len(perm) + 1)
+
+    def renumber(conn):
+        key = curve_keys(2*element_cells(grid, conn) + 1, ordering, bits)
+        return new[conn[np.argsort(key, kind='stable')] - 1].astype(np.int32)
+
+    connectivity = {k: renumber(v) for k, v in mesh.connectivity.items()}
+    faces = {k: renumber(v) for k, v in mesh.boundary_faces.items()}
+
+    # The nodes no longer follow the grid
+    return Mesh(mesh.nodes[perm], connectivity, mesh.physical_tags, faces)
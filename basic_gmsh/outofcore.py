@@ -0,0 +1,116 @@
+import io
+
+import numpy as np
+
+from basic_gmsh.cells import DIMS, ETYPES, FACES
+from basic_gmsh.connectivity import block_connectivity, block_grid
+from basic_gmsh.mesh import (cell_blocks, has_mid, make_physical_tags,
+                             per_axis, per_axis_spacing)
+from basic_gmsh.msh import CHUNK, write_header, write_periodic
+from basic_gmsh.nodes import axis_points, cell_centres, grid_points
+
+
+def layer_slabs(grid, per_cell):
+    # Ranges of layers along the last axis of a grid, each slab holding
+    # about CHUNK rows
+    layer = int(np.prod(grid[:-1]))*per_cell
+    step = max(1, CHUNK // max(layer, 1))
+
+    for lo in range(0, grid[-1], step):
+        yield lo, min(lo + step, grid[-1]), layer
+
+
+def fill(path, offset, dtype, rows, data):
+    # Write rows of data into the file in place, mapping only that region
+    mm = np.memmap(path, dtype=dtype, mode='r+', offset=offset,
+                   shape=(rows,) + data.shape[1:])
+    mm[:] = data
+    mm.flush()
+    del mm
+
+
+def write_mmap(path, shape, cell_type, nx, l=1, x0=0, periodic=False,
+               spacing='uniform', split=None):
+    # Write a binary MSH 2.2 file of exactly computable size straight into
+    # a memory map, one slab of layers at a time
+    dim = DIMS[shape]
+    blocks = cell_blocks(shape, cell_type, split)
+    npts = tuple(n + 1 for n in per_axis(nx, dim))
+    l, x0 = per_axis(l, dim), per_axis(x0, dim)
+    spacing = per_axis_spacing(spacing, dim)
+    tags = make_physical_tags(shape, cell_type)
+
+    R = [axis_points(n, b, a, s) for n, b, a, s in zip(npts, l, x0, spacing)]
+    regions = [R]
+    if has_mid(blocks):
+        regions.append([cell_centres(r) for r in R])
+
+    nnodes = sum(int(np.prod([len(a) for a in ax])) for ax in regions)
+    nele = sum(int(np.prod(block_grid(npts, b)))*len(b.template)
+               for b in blocks)
+
+    rec = np.dtype([('id', np.int32), ('x', np.float64, (3,))])
+
+    f = io.BytesIO()
+    write_header(f, tags, binary=True)
+    f.write(f'$Nodes\n{nnodes}\n'.encode())
+    head = f.getvalue()
+    mid = f'\n$EndNodes\n$Elements\n{nele}\n'.encode()
+    tail = b'\n$EndElements\n'
+
+    # Offsets of every section, one element header per block
+    offset = len(head) + nnodes*rec.itemsize + len(mid)
+    layout = []
+    for b in blocks:
+        n = int(np.prod(block_grid(npts, b)))*len(b.template)
+        layout.append((b, offset, n))
+        offset += 12 + 4*n*(3 + len(b.template[0]))
+
+    with open(path, 'wb') as fh:
+        fh.truncate(offset + len(tail))
+        fh.write(head)
+        fh.seek(len(head) + nnodes*rec.itemsize)
+        fh.write(mid)
+        fh.seek(offset)
+        fh.write(tail)
+
+        for b, off, n in layout:
+            if b.axis is None:
+                etype = ETYPES[cell_type]
+            else:
+                etype = ETYPES[FACES[dim][len(b.template[0])]]
+
+            fh.seek(off)
+            fh.write(np.array([etype, n, 2], dtype=np.int32).tobytes())
+
+    # Grid nodes then centroid nodes, slab by slab along the last axis
+    start = 0
+    for axes in regions:
+        grid = [len(a) for a in axes]
+        for lo, hi, layer in layer_slabs(grid, 1):
+            x = grid_points(axes[:-1] + [axes[-1][lo:hi]])
+            data = np.empty(len(x), dtype=rec)
+            data['id'] = np.arange(start + lo*layer + 1,
+                                   start + lo*layer + len(x) + 1)
+            data['x'] = x
+            fill(path, len(head) + (start + lo*layer)*rec.itemsize, rec,
+                 len(x), data)
+        start += int(np.prod(grid))
+
+    # Element blocks
+    nele = 0
+    for b, off, n in layout:
+        width = 3 + len(b.template[0])
+        for lo, hi, layer in layer_slabs(block_grid(npts, b),
+                                         len(b.template)):
+            conn = block_connectivity(npts, b, lo, hi)
+            ids = nele + lo*layer + np.arange(1, len(conn) + 1)
+            data = np.column_stack([ids, np.full_like(ids, b.phys),
+                                    np.full_like(ids, b.elem), conn])
+            fill(path, off + 12 + 4*width*lo*layer, np.int32, len(conn),
+                 data.astype(np.int32))
+        nele += n
+
+    if periodic:
+        with open(path, 'ab') as fh:
+            write_periodic(fh, npts, tags)
@@ -0,0 +1,133 @@
+from itertools import product
+
+import numpy as np
+
+from basic_gmsh.compress import SUFFIXES, open_output
+from basic_gmsh.connectivity import index_coords
+from basic_gmsh.mesh import Mesh
+from basic_gmsh.msh import map_chunks, write_msh
+
+
+def prime_factors(n):
+    f, p = [], 2
+    while p*p <= n:
+        while n % p == 0:
+            f.append(p)
+            n //= p
+        p += 1
+
+    return f + [n] if n > 1 else f
+
+
+def partition_dims(nparts, counts):
+    # Give each prime factor, largest first, to the axis with the most cells
+    # per part
+    dims = [1]*len(counts)
+    for p in prime_factors(nparts)[::-1]:
+        a = max(range(len(counts)), key=lambda a: counts[a] / dims[a])
+        dims[a] *= p
+
+    if any(d > c for d, c in zip(dims, counts)):
+        raise ValueError(f'Cannot split {counts} cells into {nparts} parts')
+
+    return dims
+
+
+def element_cells(grid, conn):
+    # Cell containing each element, from the mean of its nodes in index
+    # space; faces on the upper boundaries belong to the last cell
+    x = index_coords(grid, conn).mean(axis=1)
+    return np.clip(np.floor(x).astype(int), 0, np.array(grid) - 2)
+
+
+def element_parts(grid, conn, bounds, dims):
+    cells = element_cells(grid, conn)
+    part = [np.searchsorted(b, cells[:, a], side='right') - 1
+            for a, b in enumerate(bounds)]
+
+    return np.ravel_multi_index(part, dims, order='F')
+
+
+def shared_nodes(grid, nodes, bounds, dims, rank):
+    # Local indices of the nodes on each interface with a neighbouring part,
+    # in global order so both sides of an interface list them alike
+    c = index_coords(grid, nodes)
+    part = np.unravel_index(rank, dims, order='F')
+    lo = np.array([b[p] for b, p in zip(bounds, part)])
+    hi = np.array([b[p + 1] for b, p in zip(bounds, part)])
+
+    on = {-1: (c == lo) & (lo > 0), 1: (c == hi) & (hi < grid - 1)}
+
+    shared = {}
+    for off in product((-1, 0, 1), repeat=len(dims)):
+        if any(off):
+            m = np.ones(len(nodes), dtype=bool)
+            for a, o in enumerate(off):
+                if o:
+                    m &= on[o][:, a]
+
+            if m.any():
+                nbr = np.ravel_multi_index(np.add(part, off), dims,
+                                           order='F')
+                shared[int(nbr)] = np.flatnonzero(m) + 1
+
+    return shared
+
+
+def partition_mesh(mesh, nparts):
+    # Split a structured mesh into nparts blocks of cells, returning the
+    # local mesh and shared nodes of each part
+    grid = np.array(mesh.grid)
+    counts = grid - 1
+    dims = partition_dims(nparts, counts)
+    bounds = [np.linspace(0, c, d + 1).round().astype(int)
+              for c, d in zip(counts, dims)]
+
+    groups = [mesh.boundary_faces, mesh.connectivity]
+    owners = [{k: element_parts(grid, v, bounds, dims) for k, v in g.items()}
+              for g in groups]
+
+    parts = []
+    for rank in range(nparts):
+        local = [{k: v[o[k] == rank] for k, v in g.items()}
+                 for g, o in zip(groups, owners)]
+
+        nodes = np.unique(np.concatenate([v.ravel() for g in local
+                                          for v in g.values()]))
+        faces, conn = [{k: (np.searchsorted(nodes, v) + 1).astype(np.int32)
+                        for k, v in g.items()} for g in local]
+
+        part = Mesh(mesh.nodes[nodes - 1], conn, mesh.physical_tags, faces)
+        parts.append((part, shared_nodes(grid, nodes, bounds, dims, rank)))
+
+    return parts
+
+
+def write_shared(f, shared):
+    # Neighbour rank and count, then the local node indices shared with it
+    f.write(f'$SharedNodes\n{len(shared)}\n'.encode())
+    for nbr, nodes in shared.items():
+        f.write(f'{nbr} {len(nodes)}\n'.encode())
+        f.write(''.join(f'{n}\n' for n in nodes.tolist()).encode())
+    f.write(b'$EndSharedNodes\n')
+
+
+def write_part(path, part, shared, binary=False, write=write_msh,
+               compress=None):
+    with open_output(path, compress) as f:
+        write(f, part, binary)
+        write_shared(f, shared)
+
+
+def write_parts(stem, mesh, nparts, binary=False, jobs=1, write=write_msh,
+                compress=None):
+    suffix = SUFFIXES.get(compress, '')
+    paths = [f'{stem}_p{rank}.msh{suffix}' for rank in range(nparts)]
+    parts = partition_mesh(mesh, nparts)
+
+    tasks = ((write_part, path, part, shared, binary, write, compress)
+             for path, (part, shared) in zip(paths, parts))
+    for _ in map_chunks(tasks, jobs):
+        pass
+
+    return paths
@@ -0,0 +1,27 @@
+import numpy as np
+
+from basic_gmsh.connectivity import grid_base, grid_strides
+
+
+def face_nodes(grid, axis, side):
+    # Every node on one side of the grid, first free axis fastest
+    free = [a for a in range(len(grid)) if a != axis]
+    strides = grid_strides(grid)
+    base = grid_base([grid[a] for a in free], strides[free])
+
+    return base + side*(grid[axis] - 1)*strides[axis]
+
+
+def periodic_pairs(grid):
+    # Each node on the right face of every axis with its image on the left
+    return {a: np.column_stack([face_nodes(grid, a, 1),
+                                face_nodes(grid, a, 0)]).astype(np.int32)
+            for a in range(len(grid))}
+
+
+def periodic_links(grid, physical_tags):
+    # Dimension, slave and master entities, and node pairs of each axis
+    for a, pairs in periodic_pairs(grid).items():
+        r = physical_tags[f'periodic_{a}_r']
+        l = physical_tags[f'periodic_{a}_l']
+        yield r[0], r[2], l[2], pairs
@@ -0,0 +1,80 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Stage records of the innermost active profile, or None, and whether it
+# traces memory
+RECORDS = None
+MEMORY = False
+
+
+@contextmanager
+def profile(memory=False):
+    # Collect the time of every stage run inside the block as {'stage',
+    # 'seconds', 'peak'} records, with the peak traced memory if memory is
+    # set and None otherwise, as tracing slows down allocations
+    global RECORDS, MEMORY
+    outer = RECORDS, MEMORY
+    RECORDS, MEMORY = [], memory
+
+    tracing = tracemalloc.is_tracing()
+    if memory and not tracing:
+        tracemalloc.start()
+    try:
+        yield RECORDS
+    finally:
+        if memory and not tracing:
+            tracemalloc.stop()
+        RECORDS, MEMORY = outer
+
+
+@contextmanager
+def stage(name):
+    if RECORDS is None:
+        yield
+        return
+
+    if not MEMORY:
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            RECORDS.append({'stage': name,
+                            'seconds': time.perf_counter() - t,
+                            'peak': None})
+        return
+
+    if hasattr(tracemalloc, 'reset_peak'):
+        tracemalloc.reset_peak()
+    else:
+        tracemalloc.stop()
+        tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    t = time.perf_counter()
+    try:
+        yield
+    finally:
+        # Peak memory allocated on top of what was held at the start
+        seconds = time.perf_counter() - t
+        peak = tracemalloc.get_traced_memory()[1] - start
+        RECORDS.append({'stage': name, 'seconds': seconds, 'peak': peak})
+
+
+def format_records(records, fmt='table'):
+    if fmt == 'json':
+        return json.dumps(records, indent=1)
+
+    # The peak column only when memory was traced, and then the times
+    # include the tracing
+    memory = any(r['peak'] is not None for r in records)
+    lines = [f'{"stage":12} {"seconds":>10}' +
+             (f' {"peak MiB":>10}' if memory else '')]
+    for r in records:
+        lines.append(f'{r["stage"]:12} {r["seconds"]:10.3f}' +
+                     (f' {r["peak"]/2**20:10.1f}' if memory else ''))
+    lines.append(f'{"total":12} {sum(r["seconds"] for r in records):10.3f}')
+    if memory:
+        lines.append('times include the overhead of tracing allocations')
+
+    return '\n'.join(lines)
@@ -0,0 +1,259 @@
+import mmap
+import re
+
+import numpy as np
+
+from basic_gmsh.cells import CELL_DIMS, ETYPES, VERTICES
+from basic_gmsh.mesh import Mesh
+from basic_gmsh.msh import map_chunks
+
+# Target number of bytes of ASCII numbers parsed at a time
+BLOCK = 2**24
+
+TYPES = {etype: name for name, etype in ETYPES.items()}
+
+
+def element_shape(etype):
+    # Dimension and number of nodes of a gmsh element type, higher orders
+    # being named by their number of nodes
+    if etype not in TYPES:
+        raise ValueError(f'Unsupported element type {etype}')
+
+    base, count = re.fullmatch(r'([a-z]+)(\d*)', TYPES[etype]).groups()
+    return CELL_DIMS[base], int(count) if count else VERTICES[base]
+
+
+def parse_tokens(path, start, end, dtype):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return np.fromstring(f.read(end - start), dtype=dtype, sep=' ')
+
+
+def ascii_blocks(mm, start, end):
+    # Byte ranges of about BLOCK bytes split at line ends
+    while start < end:
+        stop = mm.find(b'\n', start + BLOCK, end)
+        stop = end if stop < 0 else stop + 1
+        yield start, stop
+        start = stop
+
+
+class Tokens:
+    # Numbers of an ASCII section, parsed in bulk and read in order
+    def __init__(self, path, mm, start, end, dtype, jobs=1):
+        tasks = ((parse_tokens, path, a, b, dtype)
+                 for a, b in ascii_blocks(mm, start, end))
+        self.values = np.concatenate(list(map_chunks(tasks, jobs)) or
+                                     [np.empty(0, dtype)])
+        self.pos = 0
+
+    def read(self, dtype, count=1):
+        values = self.values[self.pos:self.pos + count]
+        self.pos += count
+        return values.astype(dtype)
+
+    def count(self):
+        return int(self.read(np.int64)[0])
+
+
+class Binary:
+    # Numbers of a binary section read in order straight from the file
+    def __init__(self, mm, pos):
+        self.mm = mm
+        self.pos = pos
+
+    def read(self, dtype, count=1):
+        values = np.frombuffer(self.mm, dtype, count, self.pos)
+        self.pos += values.nbytes
+        return values
+
+    def count(self):
+        # Counts of MSH 2.2 sections are ASCII lines, even in binary files
+        eol = self.mm.find(b'\n', self.pos)
+        n = int(self.mm[self.pos:eol])
+        self.pos = eol + 1
+        return n
+
+
+def tag_runs(etype, tags, conn):
+    # Split rows of elements of one type into runs with the same tags
+    cuts = np.flatnonzero((np.diff(tags, axis=0) != 0).any(axis=1)) + 1
+    for a, b in zip([0, *cuts], [*cuts, len(conn)]):
+        phys = int(tags[a, 0]) if tags.shape[1] > 0 else 0
+        elem = int(tags[a, 1]) if tags.shape[1] > 1 else phys
+        yield etype, phys, elem, conn[a:b]
+
+
+def read_nodes(s, version, binary):
+    # Node numbers and coordinates of every block
+    if version == '2.2':
+        n = s.count()
+        if binary:
+            rec = s.read(np.dtype([('id', 'i4'), ('x', 'f8', 3)]), n)
+            return [(rec['id'], rec['x'])]
+        else:
+            rows = s.read(np.float64, 4*n).reshape(n, 4)
+            return [(rows[:, 0].astype(np.int64), rows[:, 1:])]
+
+    blocks = []
+    nblocks = int(s.read('u8', 4)[0])
+    for _ in range(nblocks):
+        dim, tag, parametric = s.read('i4', 3).tolist()
+        n = int(s.read('u8')[0])
+        if parametric:
+            raise ValueError('Parametric nodes are not supported')
+
+        ids = s.read('u8', n).astype(np.int64)
+        blocks.append((ids, s.read('f8', 3*n).reshape(n, 3)))
+
+    return blocks
+
+
+def read_elements(s, version, binary, entities):
+    # Type, physical tag, elementary tag and connectivity of every group
+    groups = []
+    if version == '4.1':
+        nblocks = int(s.read('u8', 4)[0])
+        for _ in range(nblocks):
+            dim, tag, etype = s.read('i4', 3).tolist()
+            n = int(s.read('u8')[0])
+            k = element_shape(etype)[1]
+            rows = s.read('u8', n*(k + 1)).reshape(n, k + 1)
+            groups.append((etype, entities.get((dim, tag), 0), tag,
+                           rows[:, 1:]))
+    elif binary:
+        # Chunks of Type NumElm NumTags, then Id Tags IndexList rows
+        total, n = s.count(), 0
+        while n < total:
+            etype, m, ntags = s.read('i4', 3).tolist()
+            width = 1 + ntags + element_shape(etype)[1]
+            rows = s.read('i4', m*width).reshape(m, width)
+            groups += tag_runs(etype, rows[:, 1:1 + ntags],
+                               rows[:, 1 + ntags:])
+            n += m
+    else:
+        # Id Type NumTags Tags IndexList rows, taken a run of rows with the
+        # same type and number of tags at a time
+        total = s.count()
+        t = s.values[s.pos:]
+        p = 0
+        while p < len(t):
+            etype, ntags = t[p + 1:p + 3].tolist()
+            width = 3 + ntags + element_shape(etype)[1]
+            rows = t[p:p + (len(t) - p)//width*width].reshape(-1, width)
+            same = (rows[:, 1:3] == (etype, ntags)).all(axis=1)
+            n = len(rows) if same.all() else int(np.argmin(same))
+            groups += tag_runs(etype, rows[:n, 3:3 + ntags],
+                               rows[:n, 3 + ntags:])
+            p += n*width
+
+        if sum(len(g[-1]) for g in groups) != total:
+            raise ValueError(f'Expected {total} elements')
+
+    return groups
+
+
+def read_entities(s, binary):
+    # Physical tag of every entity (dim, tag), or 0 if it has none
+    entities = {}
+    counts = s.read('u8', 4).tolist()
+    for dim, count in enumerate(counts):
+        for _ in range(count):
+            tag = int(s.read('i4')[0])
+            s.read('f8', 3 if dim == 0 else 6)
+            phys = s.read('i4', int(s.read('u8')[0]))
+            entities[dim, tag] = int(phys[0]) if len(phys) else 0
+            if dim > 0:
+                s.read('i4', int(s.read('u8')[0]))
+
+    return entities
+
+
+def make_read_mesh(nodes, names, groups):
+    n = max((int(ids.max()) for ids, x in nodes if len(ids)), default=0)
+    X = np.zeros((n, 3))
+    for ids, x in nodes:
+        X[ids - 1] = x
+
+    # The highest dimension elements make up the volume, the rest are
+    # boundary faces grouped by physical name
+    named = {tag: name for dim, tag, name in names}
+    dims = [element_shape(g[0])[0] for g in groups]
+    volume = max(dims, default=0)
+
+    elems, connectivity, faces = {}, {}, {}
+    for (etype, phys, elem, conn), dim in zip(groups, dims):
+        elems.setdefault(phys, elem)
+        if dim == volume:
+            connectivity.setdefault(TYPES[etype], []).append(conn)
+        else:
+            faces.setdefault(named.get(phys, str(phys)), []).append(conn)
+
+    return Mesh(X, {k: np.concatenate(v) for k, v in connectivity.items()},
+                {name: (dim, tag, elems.get(tag, tag))
+                 for dim, tag, name in names},
+                {k: np.concatenate(v) for k, v in faces.items()})
+
+
+def read_sections(path, mm, jobs=1):
+    version, binary = None, False
+    names, entities, nodes, groups = [], {}, [], []
+
+    pos = mm.find(b'$')
+    while pos >= 0:
+        eol = mm.find(b'\n', pos)
+        name = mm[pos + 1:eol].decode().strip()
+        pos = eol + 1
+        end = b'$End' + name.encode()
+
+        if name == 'MeshFormat':
+            eol = mm.find(b'\n', pos)
+            version, ftype, dsize = mm[pos:eol].decode().split()
+            if version not in ('2.2', '4.1'):
+                raise ValueError(f'Unsupported MSH version {version}')
+
+            binary = ftype == '1'
+            pos = eol + 1
+            if binary and int(np.frombuffer(mm, 'i4', 1, pos)[0]) != 1:
+                raise ValueError('Byte swapped MSH files are not supported')
+        elif name == 'PhysicalNames':
+            body = mm[pos:mm.find(end, pos)].decode()
+            names = [(int(d), int(t), n) for d, t, n in
+                     re.findall(r'(\d+)\s+(\d+)\s+"([^"]*)"', body)]
+        elif name in ('Entities', 'Nodes', 'Elements'):
+            if binary:
+                s = Binary(mm, pos)
+            else:
+                # Node tags and coordinates share a section in MSH 4.1
+                dtype = np.int64 if name == 'Elements' else np.float64
+                s = Tokens(path, mm, pos, mm.find(end, pos), dtype, jobs)
+
+            # Arrays are copied out of the map, so it can be closed
+            if name == 'Entities':
+                entities = read_entities(s, binary)
+            elif name == 'Nodes':
+                nodes = [(ids.astype(np.int64), x.astype(np.float64))
+                         for ids, x in read_nodes(s, version, binary)]
+            else:
+                groups = [(*g[:3], g[3].astype(np.int32)) for g in
+                          read_elements(s, version, binary, entities)]
+
+            if binary:
+                pos = s.pos
+            del s
+
+        # Sections not needed here, such as $Periodic, are skipped
+        pos = mm.find(end, pos)
+        if pos < 0:
+            raise ValueError(f'Missing {end.decode()} in {path}')
+        pos = mm.find(b'$', pos + len(end))
+
+    return make_read_mesh(nodes, names, groups)
+
+
+def read_msh(path, jobs=1):
+    # Load an MSH 2.2 or 4.1 file written by the generators, ASCII or
+    # binary, as a Mesh
+    with open(path, 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return read_sections(path, mm, jobs)
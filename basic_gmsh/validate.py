@@ -0,0 +1,213 @@
+import numpy as np
+
+from basic_gmsh.cells import (CELL_EDGES, CELL_FACES, FACES, REFERENCE,
+                              VERTICES)
+from basic_gmsh.profile import stage
+
+# Elements checked at a time
+CHUNK = 2**16
+
+
+def det(a, b, c=None):
+    # Determinants of 2 or 3 column vectors given component first
+    if c is None:
+        return a[0]*b[1] - a[1]*b[0]
+
+    return (a[0]*(b[1]*c[2] - b[2]*c[1]) - a[1]*(b[0]*c[2] - b[2]*c[0]) +
+            a[2]*(b[0]*c[1] - b[1]*c[0]))
+
+
+def base_type(name):
+    # First order type of a Lagrange type, such as tet for tet10
+    return name.rstrip('0123456789')
+
+
+def corner_edges(cell_type):
+    # Every vertex with one edge per dimension and the vertices along its
+    # edges, ordered so the corner has a positive Jacobian on the reference
+    # element (the pyramid apex has four edges and is left out)
+    R = np.array(REFERENCE[cell_type], dtype=float)
+    corners = []
+    for v in range(len(R)):
+        nbrs = [b if a == v else a for a, b in CELL_EDGES[cell_type]
+                if v in (a, b)]
+        if len(nbrs) == R.shape[1]:
+            if np.linalg.det(R[nbrs] - R[v]) < 0:
+                nbrs[:2] = nbrs[1::-1]
+            corners.append([v, *nbrs])
+
+    return np.array(corners)
+
+
+def element_measures(X, conn, cell_type):
+    # Signed volume (area in 2D) and smallest corner Jacobian of every
+    # element from its vertices, the faces being straight
+    cell_type = base_type(cell_type)
+    dim = len(REFERENCE[cell_type][0])
+    corners = corner_edges(cell_type)
+
+    # Coordinates component first and elements last, so every component
+    # of a vertex is contiguous over the elements
+    X = np.ascontiguousarray(X[:, :dim].T)
+
+    volumes = np.empty(len(conn))
+    jacobians = np.empty(len(conn))
+    for i in range(0, len(conn), CHUNK):
+        P = X[:, conn[i:i + CHUNK, :VERTICES[cell_type]].T - 1]
+        P -= P[:, :1]
+
+        jacobians[i:i + CHUNK] = np.inf
+        for v, *e in corners:
+            np.minimum(jacobians[i:i + CHUNK],
+                       det(*(P[:, a] - P[:, v] for a in e)),
+                       out=jacobians[i:i + CHUNK])
+
+        # Sum over the outward faces of a vertex dotted with the vector
+        # area, from the first vertex so the faces through it add nothing
+        v = 0
+        for f in CELL_FACES[cell_type]:
+            if 0 in f:
+                continue
+            if dim == 2:
+                v += det(P[:, f[0]], P[:, f[1]]) / 2
+            else:
+                v += det(P[:, f[0]], P[:, f[2]] - P[:, f[0]],
+                         P[:, f[-1]] - P[:, f[1]]) / 6
+        volumes[i:i + CHUNK] = v
+
+    return volumes, jacobians
+
+
+def box_nodes(X, dim):
+    # Nodes on the sides of the bounding box
+    X = X[:, :dim]
+    return ((X == X.min(axis=0)) | (X == X.max(axis=0))).any(axis=1)
+
+
+def element_faces(mesh, on):
+    # Vertices of every element face with all of them on the box, as
+    # listed by the element, by number of vertices
+    faces = {}
+    for ctype, conn in mesh.connectivity.items():
+        for f in CELL_FACES[base_type(ctype)]:
+            for i in range(0, len(conn), CHUNK):
+                c = conn[i:i + CHUNK, list(f)]
+                faces.setdefault(len(f), []).append(c[on[c - 1].all(axis=1)])
+
+    return {k: np.concatenate(v) for k, v in faces.items()}
+
+
+def rotate_to(faces, start):
+    # Rotate the vertices of every face to begin at start, except edges,
+    # for which rotating would be the same as reversing
+    if faces.shape[1] <= 2:
+        return faces
+
+    shift = np.argmax(faces == start[:, None], axis=1)
+    k = faces.shape[1]
+    return np.take_along_axis(faces, (np.arange(k) + shift[:, None]) % k,
+                              axis=1)
+
+
+def face_problems(mesh, on):
+    # The boundary faces must cover exactly the faces of the volume that
+    # only one element has, once each, and each physical group must list
+    # its faces all the same way round
+    problems = []
+    faces = element_faces(mesh, on)
+
+    boundary = {}
+    for name, conn in mesh.boundary_faces.items():
+        k = VERTICES[base_type(FACES[mesh.dim][conn.shape[1]])]
+        boundary.setdefault(k, []).append((name, conn[:, :k]))
+
+    for k in sorted(set(faces) | set(boundary)):
+        E = faces.get(k, np.empty((0, k), dtype=np.int32))
+        groups = boundary.get(k, [])
+        B = np.concatenate([c for n, c in groups] +
+                           [np.empty((0, k), dtype=np.int32)])
+        group = np.repeat(np.arange(len(groups)),
+                          [len(c) for n, c in groups]).astype(int)
+
+        keys, index = np.unique(np.sort(np.vstack([E, B]), axis=1), axis=0,
+                                return_inverse=True)
+        index = index.ravel()
+        ne = np.bincount(index[:len(E)], minlength=len(keys))
+        nb = np.bincount(index[len(E):], minlength=len(keys))
+
+        if (ne > 2).any():
+            problems.append(f'{(ne > 2).sum()} faces are shared by more '
+                            'than two elements')
+        if ((ne == 1) & (nb == 0)).any():
+            problems.append(f'{((ne == 1) & (nb == 0)).sum()} faces of only '
+                            'one element have no boundary face')
+        if ((nb > 0) & (ne != 1)).any():
+            problems.append(f'{((nb > 0) & (ne != 1)).sum()} boundary faces '
+                            'are not on the boundary of the volume')
+        if (nb > 1).any():
+            problems.append(f'{(nb > 1).sum()} boundary faces are repeated')
+
+        # Element faces are listed outward, so rotate each one to start
+        # where its boundary face does and compare it both ways round
+        first = np.full(len(keys), -1)
+        first[index[:len(E)]] = np.arange(len(E))
+        e = first[index[len(E):]]
+        match = (e >= 0) & (ne[index[len(E):]] == 1)
+        Em, Bm = E[e[match]], B[match]
+
+        outward = (rotate_to(Em, Bm[:, 0]) == Bm).all(axis=1)
+        inward = (rotate_to(Em[:, ::-1], Bm[:, 0]) == Bm).all(axis=1)
+
+        for g, (name, conn) in enumerate(groups):
+            on = group[match] == g
+            if (~outward & ~inward)[on].any():
+                problems.append(f'{(~outward & ~inward)[on].sum()} of the '
+                                f'{name} faces cross over themselves')
+
+            # The fewer of the two orientations are the odd ones out
+            n = min(outward[on].sum(), inward[on].sum())
+            if n:
+                problems.append(f'{n} of the {name} faces point the other '
+                                'way from the rest')
+
+    return problems
+
+
+def mesh_problems(mesh, volume=None):
+    # Descriptions of everything wrong with a mesh, which is expected to
+    # fill a box of the given volume, by default its bounding box
+    problems = []
+    X = mesh.nodes
+    dim = mesh.dim
+
+    for name, conn in [*mesh.connectivity.items(),
+                       *mesh.boundary_faces.items()]:
+        if len(conn) and (conn.min() < 1 or conn.max() > len(X)):
+            problems.append(f'{name} elements refer to missing nodes')
+    if problems:
+        return problems
+
+    total = 0
+    for ctype, conn in mesh.connectivity.items():
+        volumes, jacobians = element_measures(X, conn, ctype)
+        total += volumes.sum()
+        if (jacobians <= 0).any():
+            problems.append(f'{(jacobians <= 0).sum()} {ctype} elements '
+                            'are inverted or degenerate')
+
+    if volume is None:
+        volume = np.prod(np.ptp(X[:, :dim], axis=0))
+    if not np.isclose(total, volume, rtol=1e-9, atol=0):
+        problems.append(f'Total volume {float(total)!r} is not '
+                        f'{float(volume)!r}')
+
+    return problems + face_problems(mesh, box_nodes(X, dim))
+
+
+def validate(mesh, volume=None):
+    # Raise a ValueError listing every problem found with a mesh
+    with stage('validate'):
+        problems = mesh_problems(mesh, volume)
+
+    if problems:
+        raise ValueError('Invalid mesh:\n' + '\n'.join(problems))
@@ -0,0 +1,139 @@
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from basic_gmsh.cells import BLOCKS, DIMS, TET_SPLITS
+from basic_gmsh.mesh import Mesh, mesh_elements, mesh_nodes, per_axis
+from basic_gmsh.msh import write_msh
+from basic_gmsh.msh4 import write_msh4
+
+WRITERS = {'2.2': write_msh, '4.1': write_msh4}
+
+# Default number of cells per axis for each shape
+SWEEP = {'square': [64, 128, 256, 512, 1024], 'cube': [8, 16, 32, 64]}
+
+
+def run_case(shape, cell_type, nx, fmt, binary, directory, split=None):
+    # One mesh, timed stage by stage with the same calls as make_mesh; run
+    # in a fresh process so the peak RSS is its own
+    times = {}
+    npts = tuple(n + 1 for n in per_axis(nx, DIMS[shape]))
+
+    t = time.perf_counter()
+    X = mesh_nodes(shape, cell_type, nx, split=split)
+    times['nodes'] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    tags, faces, connectivity = mesh_elements(shape, cell_type, nx, split)
+    mesh = Mesh(X, connectivity, tags, faces, npts)
+    times['connectivity'] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    f = io.BytesIO()
+    WRITERS[fmt](f, mesh, binary)
+    data = f.getbuffer()
+    times['formatting'] = time.perf_counter() - t
+
+    path = os.path.join(directory, f'{shape}_{cell_type}_nx{nx}.msh')
+    t = time.perf_counter()
+    with open(path, 'wb') as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    times['io'] = time.perf_counter() - t
+    os.remove(path)
+
+    total = sum(times.values())
+    return {
+        'shape': shape, 'cell': cell_type, 'nx': nx, 'split': split,
+        'format': fmt, 'binary': binary, 'nodes': len(X),
+        'elements': sum(len(c) for g in (faces, connectivity)
+                        for c in g.values()),
+        'bytes': len(data), 'seconds': times, 'total': total,
+        'bytes_per_second': len(data) / total,
+        # ru_maxrss is in KiB on Linux and bytes on macOS
+        'peak_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss *
+        (1 if sys.platform == 'darwin' else 1024),
+    }
+
+
+def git_commit():
+    try:
+        here = os.path.dirname(os.path.abspath(__file__))
+        return subprocess.run(['git', '-C', here, 'rev-parse', 'HEAD'],
+                              check=True, capture_output=True,
+                              text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Time generating and writing every mesh over a sweep of '
+                    'sizes')
+    parser.add_argument('-c', '--cell', nargs='+', dest='cells',
+                        choices=sorted(f'{s}_{c}' for s, c in BLOCKS),
+                        help='shape_cell cases, all by default')
+    parser.add_argument('-n', '--nx', nargs='+', type=int,
+                        help='cells per axis, overriding the default sweep')
+    parser.add_argument('-f', '--format', default='2.2',
+                        choices=sorted(WRITERS))
+    parser.add_argument('--binary', action='store_true')
+    parser.add_argument('--split', type=int, choices=sorted(TET_SPLITS),
+                        help='tets per cell of the cube_tet cases')
+    parser.add_argument('-r', '--repeat', default=1, type=int,
+                        help='keep the fastest of this many runs')
+    parser.add_argument('-o', '--output', help='JSON file for the results')
+    parser.add_argument('-d', '--directory', default=tempfile.gettempdir(),
+                        help='where meshes are written, then removed')
+
+    args = parser.parse_args(argv)
+
+    cases = [tuple(c.split('_')) for c in args.cells or
+             sorted(f'{s}_{c}' for s, c in BLOCKS)]
+    if args.split:
+        cases = [c for c in cases if c == ('cube', 'tet')]
+        if not cases:
+            parser.error('--split only applies to the cube_tet cases')
+
+    results = []
+    ctx = multiprocessing.get_context('spawn')
+    for shape, cell_type in cases:
+        for nx in args.nx or SWEEP[shape]:
+            runs = []
+            for _ in range(args.repeat):
+                with ProcessPoolExecutor(1, mp_context=ctx) as pool:
+                    runs.append(pool.submit(run_case, shape, cell_type, nx,
+                                            args.format, args.binary,
+                                            args.directory,
+                                            args.split).result())
+            r = min(runs, key=lambda r: r['total'])
+            results.append(r)
+
+            s = r['seconds']
+            print(f'{shape:6} {cell_type:4} {nx:5} '
+                  f'nodes {s["nodes"]:7.3f} conn {s["connectivity"]:7.3f} '
+                  f'fmt {s["formatting"]:7.3f} io {s["io"]:7.3f} s  '
+                  f'{r["bytes_per_second"]/2**20:7.1f} MiB/s  '
+                  f'rss {r["peak_rss"]/2**20:7.1f} MiB', flush=True)
+
+    if args.output:
+        meta = {'commit': git_commit(), 'python': platform.python_version(),
+                'numpy': np.__version__, 'machine': platform.machine()}
+        with open(args.output, 'w') as f:
+            json.dump({'meta': meta, 'results': results}, f, indent=1)
+
+
+if __name__ == '__main__':
+    main()